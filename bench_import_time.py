@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Start-up benchmark for netops.py (lazy imports)
+
+Times early-exit paths of the CLI against the imports the old scripts
+did at module top before they could exit (pandas/netmiko/requests/
+tabulate for 12.py-15.py, pyATS/tabulate for the config push).
+Each case runs in a fresh interpreter; the median of BENCH_RUNS runs
+is reported.
+
+Run:
+  python bench_import_time.py
+"""
+
+import os
+import sys
+import time
+import statistics
+import subprocess
+
+# ===============================
+# CONFIGURATION
+# ===============================
+RUNS = int(os.getenv("BENCH_RUNS", "5"))
+HERE = os.path.dirname(os.path.abspath(__file__))
+NETOPS = os.path.join(HERE, "netops.py")
+
+# Environment without the parameters, so every CLI case exits early
+EARLY_EXIT_ENV = {
+    k: v for k, v in os.environ.items()
+    if k not in ("LIBRENMS_TOKEN", "CONFIG_COMMANDS", "TESTBEDS")
+}
+
+CASES = [
+    ("netops --help", [NETOPS, "--help"]),
+    ("netops ports (no LIBRENMS_TOKEN)", [NETOPS, "ports"]),
+    ("netops push (no CONFIG_COMMANDS)", [NETOPS, "push"]),
+    ("eager: pandas+netmiko+requests+tabulate",
+     ["-c", "import pandas, netmiko, requests, tabulate"]),
+    ("eager: pyats.topology+pyats.async_+tabulate",
+     ["-c", "import pyats.topology, pyats.async_, tabulate"]),
+]
+
+# ===============================
+# MAIN
+# ===============================
+def time_case(argv):
+    """Median wall seconds, or None if the interpreter could not run it."""
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, *argv],
+            env=EARLY_EXIT_ENV,
+            cwd=HERE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        samples.append(time.perf_counter() - start)
+
+        if proc.returncode != 0 and b"ModuleNotFoundError" in proc.stderr:
+            return None
+    return statistics.median(samples)
+
+
+def main():
+    print(f"\n📈 Start-up benchmark ({RUNS} runs per case, median)\n")
+
+    width = max(len(name) for name, _ in CASES)
+    for name, argv in CASES:
+        seconds = time_case(argv)
+        shown = "not installed" if seconds is None else f"{seconds * 1000:8.1f} ms"
+        print(f"  {name:<{width}}  {shown}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Push engine benchmark: pcall (process per device) vs bounded threads
+
+Every device is simulated: connect / configure / write memory only wait
+(like a switch would) and each session holds a small buffer, similar to
+a unicon connection. The same fleet is pushed with both engines while a
+sampler records the peak RSS of the agent (this process + children).
+
+Run:
+  python bench_push_engines.py
+  BENCH_DEVICES=500 BENCH_MAX_IN_FLIGHT=100 python bench_push_engines.py
+"""
+
+import os
+import time
+import threading
+import psutil
+from tabulate import tabulate
+
+# The circuit breaker batches pcall; measure the unbatched legacy engine
+os.environ.setdefault("BREAKER_MAX_FAIL_PCT", "0")
+
+import push_engine
+
+# ===============================
+# CONFIGURATION
+# ===============================
+DEVICES = int(os.getenv("BENCH_DEVICES", "200"))
+MAX_IN_FLIGHT = int(os.getenv("BENCH_MAX_IN_FLIGHT", "50"))
+ENGINES = [e.strip() for e in os.getenv("BENCH_ENGINES", "pcall,threads").split(",")]
+
+CONNECT_S = float(os.getenv("BENCH_CONNECT_S", "0.5"))
+CONFIGURE_S = float(os.getenv("BENCH_CONFIGURE_S", "0.3"))
+WRITE_S = float(os.getenv("BENCH_WRITE_S", "0.5"))
+SESSION_KB = int(os.getenv("BENCH_SESSION_KB", "256"))
+
+CONFIG = "ip access-list standard SnmpReadAcl\n 10 permit 192.168.1.254\n"
+
+# ===============================
+# SIMULATED DEVICE
+# ===============================
+class FakeDevice:
+    def __init__(self, name):
+        self.name = name
+        self.connected = False
+        self._buffer = None
+
+    def connect(self, **kwargs):
+        time.sleep(CONNECT_S)
+        self._buffer = bytearray(SESSION_KB * 1024)
+        self.connected = True
+
+    def configure(self, config, **kwargs):
+        time.sleep(CONFIGURE_S)
+
+    def execute(self, command, **kwargs):
+        time.sleep(WRITE_S)
+        return "[OK]"
+
+    def disconnect(self):
+        self._buffer = None
+        self.connected = False
+
+# ===============================
+# RSS SAMPLER
+# ===============================
+class PeakRss(threading.Thread):
+    """Peak RSS of this process and all its children, sampled every 50 ms."""
+
+    def __init__(self, exclude=()):
+        super().__init__(daemon=True)
+        self.peak = 0
+        self.exclude = set(exclude)        # pids not counted, e.g. a mock fleet server
+        self._stop_event = threading.Event()
+
+    def run(self):
+        me = psutil.Process()
+        while not self._stop_event.is_set():
+            total = 0
+            for proc in [me] + me.children(recursive=True):
+                if proc.pid in self.exclude:
+                    continue
+                try:
+                    total += proc.memory_info().rss
+                except psutil.Error:
+                    pass
+            self.peak = max(self.peak, total)
+            time.sleep(0.05)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+# ===============================
+# MAIN
+# ===============================
+def quiet_worker(device, config):
+    """run_on_device() without the per-device print."""
+    try:
+        device.connect()
+        device.configure(config)
+        device.execute("write memory")
+        return (device.name, "OK")
+    except Exception:
+        return (device.name, "NOT OK")
+    finally:
+        device.disconnect()
+
+
+def main():
+    print(
+        f"\n📈 Push engine benchmark: {DEVICES} simulated devices, "
+        f"threads max in flight={MAX_IN_FLIGHT}, "
+        f"circuit breaker={push_engine.BREAKER_MAX_FAIL_PCT:g}% (0: off, pcall unbatched)\n"
+    )
+
+    table = []
+    for engine in ENGINES:
+        targets = [("bench", FakeDevice(f"bench-sw{i:04d}")) for i in range(DEVICES)]
+
+        sampler = PeakRss()
+        sampler.start()
+        start = time.perf_counter()
+
+        results = push_engine.push(targets, CONFIG, engine=engine,
+                                   max_in_flight=MAX_IN_FLIGHT, worker=quiet_worker)
+
+        elapsed = time.perf_counter() - start
+        sampler.stop()
+
+        ok = sum(1 for r in results if r["status"] == "OK")
+        table.append([
+            engine,
+            f"{elapsed:.2f}",
+            f"{DEVICES / elapsed * 60:.0f}",
+            f"{sampler.peak / 2**20:.0f}",
+            f"{ok}/{DEVICES}",
+        ])
+        print(f"  {engine:<8} {elapsed:.2f}s")
+
+    print()
+    print(tabulate(table, headers=["Engine", "Wall s", "Devices/min", "Peak RSS MiB", "OK"], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Config push throughput against a simulated fleet (mock_fleet.py)
+
+For every fleet size a mock fleet is started in its own process, a
+matching testbed is generated, and the real push path (pyATS testbed,
+unicon sessions, push_engine) is run once per engine. Reported per run:
+wall time, devices/minute and peak RSS of the agent (this process and
+its pcall children, not the mock fleet).
+
+Run:
+  python bench_push_fleet.py
+  BENCH_FLEET_SIZES=100,1000 BENCH_ENGINES=threads MOCK_WRITE_S=2 python bench_push_fleet.py
+
+pcall forks one process per device; it is skipped above
+BENCH_PCALL_MAX_DEVICES so the agent is not pushed into swap.
+"""
+
+import io
+import os
+import sys
+import time
+import socket
+import tempfile
+import subprocess
+import contextlib
+from tabulate import tabulate
+
+# The circuit breaker batches pcall; measure the unbatched legacy engine
+os.environ.setdefault("BREAKER_MAX_FAIL_PCT", "0")
+
+import push_engine
+from mock_fleet import MOCK_PORT, device_ip, write_testbed
+from bench_push_engines import PeakRss
+
+# ===============================
+# CONFIGURATION
+# ===============================
+SIZES = [int(n) for n in os.getenv("BENCH_FLEET_SIZES", "100,1000,5000").split(",")]
+ENGINES = [e.strip() for e in os.getenv("BENCH_ENGINES", "threads,pcall").split(",")]
+MAX_IN_FLIGHT = int(os.getenv("BENCH_MAX_IN_FLIGHT", "50"))
+PCALL_MAX_DEVICES = int(os.getenv("BENCH_PCALL_MAX_DEVICES", "1000"))
+SERVER_START_TIMEOUT = 60
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+CONFIG = """\
+no ip access-list standard SNMP-ONLY
+ip access-list standard SNMP-ONLY
+ permit 192.168.1.254
+ permit 192.168.1.250
+ deny   any
+exit
+logging host 192.168.1.254
+"""
+
+# ===============================
+# MOCK FLEET
+# ===============================
+def start_fleet(size, port):
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "mock_fleet.py"), "serve", str(size), "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+    )
+
+    deadline = time.time() + SERVER_START_TIMEOUT
+    while time.time() < deadline:
+        try:
+            socket.create_connection((device_ip(size - 1), port), timeout=1).close()
+            return server
+        except OSError:
+            if server.poll() is not None:
+                break
+            time.sleep(0.2)
+
+    server.kill()
+    raise RuntimeError(f"mock fleet of {size} did not start on port {port}")
+
+# ===============================
+# MAIN
+# ===============================
+def bench(testbed_file, engine, server_pid):
+    targets, _ = push_engine.merge_testbeds([testbed_file])
+
+    sampler = PeakRss(exclude=[server_pid])
+    sampler.start()
+    start = time.perf_counter()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = push_engine.push(targets, CONFIG, engine=engine, max_in_flight=MAX_IN_FLIGHT)
+
+    elapsed = time.perf_counter() - start
+    sampler.stop()
+
+    ok = sum(1 for r in results if r["status"] == "OK")
+    return elapsed, sampler.peak, ok
+
+
+def main():
+    print(
+        f"\n📈 Push throughput on a mock fleet: sizes {SIZES}, engines {ENGINES}, "
+        f"threads max in flight={MAX_IN_FLIGHT}, "
+        f"circuit breaker={push_engine.BREAKER_MAX_FAIL_PCT:g}% (0: off, pcall unbatched)\n"
+    )
+
+    table = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in SIZES:
+            testbed_file = os.path.join(workdir, f"mock_testbed_{size}.yaml")
+            write_testbed(size, testbed_file, MOCK_PORT)
+            server = start_fleet(size, MOCK_PORT)
+
+            try:
+                for engine in ENGINES:
+                    if engine == "pcall" and size > PCALL_MAX_DEVICES:
+                        table.append([size, engine, "-", "-", "-", "skipped"])
+                        continue
+
+                    elapsed, peak, ok = bench(testbed_file, engine, server.pid)
+                    table.append([
+                        size,
+                        engine,
+                        f"{elapsed:.1f}",
+                        f"{size / elapsed * 60:.0f}",
+                        f"{peak / 2**20:.0f}",
+                        f"{ok}/{size}",
+                    ])
+                    print(f"  {size:>5} {engine:<8} {elapsed:.1f}s")
+            finally:
+                server.terminate()
+                server.wait()
+
+    print()
+    print(tabulate(
+        table,
+        headers=["Devices", "Engine", "Wall s", "Devices/min", "Peak RSS MiB", "OK"],
+        tablefmt="grid",
+    ))
+
+
+if __name__ == "__main__":
+    main()
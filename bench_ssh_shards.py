@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the sharded SSH collector (ssh_ports_parallel.py)
+
+No switches needed: every "device" is simulated by a worker that waits
+on the network (sleep) and then burns CPU the way SSH key exchange,
+cipher work and output parsing do. The same host list is collected with
+1..16 worker processes and wall time / throughput are compared.
+A quick check of the retry queue without a run deadline runs first.
+
+Run:
+  python bench_ssh_shards.py
+  BENCH_DEVICES=400 BENCH_CPU_ROUNDS=40000 python bench_ssh_shards.py
+"""
+
+import os
+import time
+import hashlib
+import threading
+from tabulate import tabulate
+
+import ssh_ports_parallel as collector
+from run_deadline import RunDeadline
+
+# ===============================
+# CONFIGURATION
+# ===============================
+DEVICES = int(os.getenv("BENCH_DEVICES", "200"))
+WORKERS_PER_SHARD = int(os.getenv("BENCH_WORKERS", "16"))
+SHARD_COUNTS = [1, 2, 4, 8, 16]
+
+IO_LATENCY = float(os.getenv("BENCH_IO_LATENCY", "0.05"))   # seconds on the wire per device
+CPU_ROUNDS = int(os.getenv("BENCH_CPU_ROUNDS", "20000"))    # sha256 rounds ~ SSH crypto + parsing
+
+SAMPLE_OUTPUT = "\n".join(
+    f"Gi1/0/{i}                      {'connected' if i % 3 else 'notconnect'} 1  a-full a-1000 10/100/1000BaseTX"
+    for i in range(1, 49)
+)
+
+# ===============================
+# SIMULATED WORKER
+# ===============================
+def simulated_worker(hostname: str):
+    time.sleep(IO_LATENCY)
+
+    digest = hostname.encode()
+    for _ in range(CPU_ROUNDS):
+        digest = hashlib.sha256(digest).digest()
+
+    total, active, media = collector.parse_interfaces(SAMPLE_OUTPUT)
+
+    row = collector.empty_row(hostname)
+    row["Total Ports"] = total
+    row["Active Ports"] = active
+    row["Port Utilization %"] = collector.pct(active, total)
+    for m in collector.MEDIA_COLUMNS:
+        row[m] = media[m]
+    return row
+
+# ===============================
+# RETRY QUEUE CHECK
+# ===============================
+def check_retries_without_deadline(hosts=6, retry_workers=2):
+    """
+    More retries than retry slots and no run deadline (the default): the
+    queue must wait for a free slot and still return every host.
+    """
+    def slow_worker(hostname):
+        time.sleep(0.1)
+        return collector.empty_row(hostname)
+
+    retries = collector.RetryQueue(
+        slow_worker, max_workers=retry_workers, base_delay=0.01, max_delay=0.01,
+        deadline=RunDeadline(0, 0),
+    )
+    drainer = threading.Thread(target=retries.drain, daemon=True)
+    drainer.start()
+    for i in range(hosts):
+        retries.put(i, f"retry-sw{i}", 2)
+    retries.close()
+    drainer.join(timeout=30)
+
+    assert not drainer.is_alive(), "retry queue did not finish"
+    assert len(retries.results) == hosts, f"{len(retries.results)} rows for {hosts} hosts"
+
+# ===============================
+# MAIN
+# ===============================
+def main():
+    check_retries_without_deadline()
+
+    targets = [f"bench-sw{i:04d}" for i in range(DEVICES)]
+
+    print(
+        f"\n📈 Sharding benchmark: {DEVICES} simulated devices, "
+        f"{WORKERS_PER_SHARD} workers/shard, cpu={os.cpu_count()}\n"
+    )
+
+    table = []
+    baseline = None
+
+    for shards in SHARD_COUNTS:
+        start = time.perf_counter()
+        rows = collector.run_sharded(targets, shards, WORKERS_PER_SHARD, worker=simulated_worker)
+        elapsed = time.perf_counter() - start
+
+        assert [r["Hostname"] for r in rows] == targets, "merged rows out of order"
+
+        if baseline is None:
+            baseline = elapsed
+
+        table.append([
+            shards,
+            f"{elapsed:.2f}",
+            f"{DEVICES / elapsed:.1f}",
+            f"{baseline / elapsed:.2f}x",
+        ])
+        print(f"  shards={shards:<3} {elapsed:.2f}s")
+
+    print()
+    print(tabulate(table, headers=["Processes", "Wall s", "Devices/s", "Speedup"], tablefmt="grid"))
+
+if __name__ == "__main__":
+    main()
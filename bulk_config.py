@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Bulk config transfer (SCP + copy to running-config)
+
+device.configure() sends a block line by line and waits for the prompt
+after every line, so large ACLs or SNMPv3 user sets are dominated by
+CLI round trips. In bulk mode the whole block is copied to the switch
+file system over SCP and applied with one `copy <file> running-config`.
+
+apply_config() picks the mode:
+- BULK_MODE=off: line mode (device.configure), as before
+- BULK_MODE=auto: bulk for blocks of BULK_MIN_LINES lines or more
+- BULK_MODE=on: bulk for every block
+If the transfer or the copy fails, the block is pushed in line mode on
+the same session ("line-fallback"). Apply times per mode are kept
+for print_apply_stats().
+
+Bulk mode needs `ip scp server enable` on the switches.
+
+Environment:
+  BULK_MODE=off          off | auto | on
+  BULK_MIN_LINES=50
+  BULK_FILESYSTEM=flash:
+"""
+
+import io
+import os
+import time
+import threading
+
+from push_journal import config_hash
+
+# ==============================
+# CONFIG
+# ==============================
+BULK_MODE = os.getenv("BULK_MODE", "off")
+BULK_MIN_LINES = int(os.getenv("BULK_MIN_LINES", "50"))
+BULK_FILESYSTEM = os.getenv("BULK_FILESYSTEM", "flash:")
+SCP_TIMEOUT = 30
+
+COPY_ERRORS = ("% Invalid", "% Incomplete", "% Ambiguous", "%Error", "% Error")
+
+LINE = "line"
+BULK = "bulk"
+FALLBACK = "line-fallback"
+
+# ==============================
+# APPLY TIMES
+# ==============================
+_times_lock = threading.Lock()
+APPLY_TIMES = {}     # mode -> [seconds, ...]
+
+
+def record_time(mode, seconds):
+    with _times_lock:
+        APPLY_TIMES.setdefault(mode, []).append(seconds)
+
+# ==============================
+# TRANSFER
+# ==============================
+def scp_target(device):
+    """(ip, port, username, password) of the device CLI connection."""
+    cli = device.connections["cli"]
+    credentials = device.credentials or device.testbed.credentials
+    default = credentials["default"]
+    password = default["password"]
+
+    return (
+        str(cli["ip"]),
+        int(cli.get("port") or 22),
+        default["username"],
+        getattr(password, "plaintext", password),
+    )
+
+
+def upload(device, config, remote_file):
+    import paramiko
+    from scp import SCPClient
+
+    ip, port, username, password = scp_target(device)
+
+    client = paramiko.SSHClient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    try:
+        client.connect(ip, port=port, username=username, password=password,
+                       timeout=SCP_TIMEOUT, allow_agent=False, look_for_keys=False)
+        with SCPClient(client.get_transport(), socket_timeout=SCP_TIMEOUT) as scp:
+            scp.putfo(io.BytesIO(config.encode()), remote_file)
+    finally:
+        client.close()
+
+
+def copy_to_running(device, remote_file):
+    from unicon.eal.dialogs import Dialog, Statement
+
+    confirm = Dialog([
+        Statement(pattern=r"Destination filename \[running-config\]\?",
+                  action="sendline()", loop_continue=True, continue_timer=False),
+    ])
+    output = device.execute(f"copy {remote_file} running-config", reply=confirm)
+
+    errors = [line.strip() for line in output.splitlines() if line.strip().startswith(COPY_ERRORS)]
+    if errors:
+        raise RuntimeError(f"copy to running-config: {errors[0]}")
+
+
+def bulk_configure(device, config):
+    """Upload `config` and apply it with one copy; the file is removed afterwards."""
+    remote_file = f"{BULK_FILESYSTEM}netops-{config_hash(config)}.cfg"
+
+    upload(device, config, remote_file)
+    try:
+        copy_to_running(device, remote_file)
+    finally:
+        try:
+            device.execute(f"delete /force {remote_file}")
+        except Exception:
+            pass
+
+# ==============================
+# APPLY
+# ==============================
+def use_bulk(config, mode=BULK_MODE):
+    if mode == "on":
+        return True
+    if mode == "auto":
+        return len([line for line in config.splitlines() if line.strip()]) >= BULK_MIN_LINES
+    return False
+
+
+def apply_config(device, config, mode=BULK_MODE):
+    """Apply `config` on a connected device; returns the mode that was used."""
+    started = time.time()
+
+    if use_bulk(config, mode):
+        try:
+            bulk_configure(device, config)
+            record_time(BULK, time.time() - started)
+            return BULK
+        except Exception as e:
+            print(f"[BULK] {device.name}: {e}, falling back to line mode")
+
+        started = time.time()
+        device.configure(config)
+        record_time(FALLBACK, time.time() - started)
+        return FALLBACK
+
+    device.configure(config)
+    record_time(LINE, time.time() - started)
+    return LINE
+
+
+def print_apply_stats():
+    """Apply time per mode (threads engine; pcall children keep their own)."""
+    with _times_lock:
+        times = {mode: list(seconds) for mode, seconds in APPLY_TIMES.items()}
+    if not times:
+        return
+
+    print("\n⏱️ Config apply time per mode")
+    for mode in (BULK, LINE, FALLBACK):
+        seconds = times.get(mode)
+        if seconds:
+            print(
+                f"   {mode:<16} devices={len(seconds):<5} "
+                f"avg={sum(seconds) / len(seconds):.2f}s  max={max(seconds):.2f}s"
+            )
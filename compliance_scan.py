@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Read-only fleet compliance scan
+
+Evaluates required / forbidden line rules (compliance_rules.txt) against
+the running config of every device in the selected testbeds. Running
+configs come from a local cache (a ConfigArchive in SCAN_CACHE_DIR);
+only devices whose cached copy is older than SCAN_TTL_HOURS, or older
+than their last push in the push journal, are fetched, in parallel, so
+repeated queries are answered without new sessions.
+
+Run:
+  python netops.py scan -T testbed_access_9200.yaml,testbed_access_2960.yaml
+  python netops.py scan -T testbed_access_9200.yaml -r my_rules.txt --refresh
+  python compliance_scan.py -T testbed_access_9200.yaml --cached-only
+
+Environment:
+  SCAN_CACHE_DIR=running_config_cache
+  SCAN_TTL_HOURS=24
+  SCAN_MAX_IN_FLIGHT=50
+  SCAN_RULES=compliance_rules.txt
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from config_archive import ConfigArchive
+from config_check import missing_lines, parse_config
+from push_journal import PushJournal
+
+# ==============================
+# CONFIG
+# ==============================
+SCAN_CACHE_DIR = os.getenv("SCAN_CACHE_DIR", "running_config_cache")
+SCAN_TTL_HOURS = float(os.getenv("SCAN_TTL_HOURS", "24"))
+SCAN_MAX_IN_FLIGHT = int(os.getenv("SCAN_MAX_IN_FLIGHT", "50"))
+SCAN_RULES = os.getenv("SCAN_RULES", "compliance_rules.txt")
+
+RULE_HEADER_RE = re.compile(r"^\[(required|forbidden)\s+(.+?)\]\s*$")
+
+PASS = "PASS"
+FAIL = "FAIL"
+NO_CONFIG = "NO CONFIG"
+
+# ==============================
+# RULES
+# ==============================
+def load_rules(path=SCAN_RULES):
+    """[(name, "required" | "forbidden", block), ...] in file order."""
+    rules = []
+    current = None
+
+    with open(path) as f:
+        for raw in f:
+            if raw.lstrip().startswith("#"):
+                continue
+            header = RULE_HEADER_RE.match(raw.strip())
+            if header:
+                current = [header.group(2), header.group(1), []]
+                rules.append(current)
+            elif current is not None and raw.strip():
+                current[2].append(raw.rstrip("\n"))
+
+    return [(name, kind, "\n".join(lines) + "\n") for name, kind, lines in rules]
+
+
+def evaluate(running, rules):
+    """{rule name: [offending lines]} ([] = pass)."""
+    findings = {}
+    for name, kind, block in rules:
+        missing = missing_lines(running, block)
+        if kind == "required":
+            findings[name] = missing
+        else:
+            # A parent with sub-lines only gives the context ("line vty 0 4")
+            parents = {parent for parent, children in parse_config(block) if children}
+            present = [line for line in missing_lines("", block) if line not in missing]
+            findings[name] = [line for line in present if line not in parents]
+    return findings
+
+# ==============================
+# CACHE / FETCH
+# ==============================
+def fetch_running(device):
+    """(device name, running config or None)."""
+    try:
+        device.connect(
+            learn_hostname=True,
+            init_exec_commands=[],
+            init_config_commands=[]
+        )
+        return (device.name, device.execute("show running-config"))
+    except Exception as e:
+        print(f"[ERROR] {device.name}: {e}")
+        return (device.name, None)
+    finally:
+        if device.connected:
+            device.disconnect()
+
+
+def refresh_cache(devices, cache, ttl_hours=SCAN_TTL_HOURS, refresh=False,
+                  max_in_flight=SCAN_MAX_IN_FLIGHT):
+    """Fetch the devices without a fresh cached config; returns the number fetched."""
+    from reachability import PREFLIGHT, split_reachable
+
+    oldest = time.time() - ttl_hours * 3600
+    pushed = PushJournal().last_changes()
+    stale = []
+    for device in devices:
+        cached = cache.lookup(device.name)
+        if refresh or cached is None or cached[0] < max(oldest, pushed.get(device.name, 0)):
+            stale.append(device)
+
+    print(f"🗄️ Cache: {len(devices) - len(stale)} fresh, {len(stale)} to fetch (TTL {ttl_hours:g}h)")
+    if PREFLIGHT and stale:
+        stale, _ = split_reachable(stale)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as pool:
+        for name, running in pool.map(fetch_running, stale):
+            if running:
+                cache.put(name, running)
+
+    return len(stale)
+
+# ==============================
+# REPORT
+# ==============================
+def scan(devices, rules, cache):
+    """[{"device", "testbed", "age h", rule name: PASS / FAIL, ...}, ...] and findings."""
+    rows = []
+    findings = {}
+    now = time.time()
+
+    for tb_file, device in devices:
+        row = {"device": device.name, "testbed": tb_file}
+        cached = cache.lookup(device.name)
+
+        if cached is None:
+            row["age h"] = "-"
+            row.update((name, NO_CONFIG) for name, _, _ in rules)
+        else:
+            ts, sha = cached
+            row["age h"] = round((now - ts) / 3600, 1)
+            findings[device.name] = evaluate(cache.read(sha), rules)
+            row.update(
+                (name, FAIL if lines else PASS) for name, lines in findings[device.name].items()
+            )
+        rows.append(row)
+
+    return rows, findings
+
+
+def print_scan_report(rows, rules):
+    from tabulate import tabulate
+
+    print("\n================ Compliance Report ================\n")
+    print(tabulate(rows, headers="keys", tablefmt="grid"))
+
+    print()
+    for name, kind, _ in rules:
+        failing = [r["device"] for r in rows if r[name] == FAIL]
+        unknown = sum(1 for r in rows if r[name] == NO_CONFIG)
+        print(
+            f"{name:<20} ({kind:<9}) pass {sum(1 for r in rows if r[name] == PASS):<5} "
+            f"fail {len(failing):<5} no config {unknown}"
+        )
+    print("===================================================")
+
+# ==============================
+# MAIN
+# ==============================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read-only compliance scan on cached running configs")
+    parser.add_argument("-T", "--testbeds", default=os.getenv("TESTBEDS", ""),
+                        help="comma separated testbed files (default: $TESTBEDS)")
+    parser.add_argument("-r", "--rules", default=SCAN_RULES)
+    parser.add_argument("--ttl", type=float, default=SCAN_TTL_HOURS, help="cache TTL in hours")
+    parser.add_argument("--refresh", action="store_true", help="fetch every device, ignore the cache")
+    parser.add_argument("--cached-only", action="store_true", help="never connect, cache only")
+    parser.add_argument("--json", help="also write the findings (offending lines) to this file")
+    args = parser.parse_args(argv)
+
+    testbed_files = [tb.strip() for tb in args.testbeds.split(",") if tb.strip()]
+    if not testbed_files:
+        print("❌ No testbeds selected (use -T a.yaml,b.yaml)")
+        sys.exit(1)
+    for path in testbed_files + [args.rules]:
+        if not os.path.isfile(path):
+            print(f"❌ File not found: {path}")
+            sys.exit(1)
+
+    from push_engine import merge_testbeds
+
+    start_time = time.time()
+    rules = load_rules(args.rules)
+    targets, _ = merge_testbeds(testbed_files)
+    cache = ConfigArchive(SCAN_CACHE_DIR)
+
+    print(f"\n🔎 Compliance scan: {len(targets)} devices, {len(rules)} rule(s) from {args.rules}")
+    if not args.cached_only:
+        refresh_cache([device for _, device in targets], cache, args.ttl, args.refresh)
+
+    rows, findings = scan(targets, rules, cache)
+    print_scan_report(rows, rules)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(findings, f, indent=2)
+        print(f"✅ Findings saved to {args.json}")
+
+    print(f"\n⏱️ Total runtime: {time.time() - start_time:.2f} seconds")
+
+
+if __name__ == "__main__":
+    main()
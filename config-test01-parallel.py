@@ -2,9 +2,18 @@
 
 from pyats.topology import loader
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
 import time
 import traceback
 
+from save_ledger import SaveLedger
+
+TESTBED_FILE = "testbed.yaml"
+
+# SAVE_MODE=defer: no write memory, pending devices are saved later by `python netops.py save`
+SAVE_MODE = os.getenv("SAVE_MODE", "now")
+ledger = SaveLedger()
+
 CONFIG_COMMANDS = """\
 logging host 192.168.1.254 session-id string techit
 logging trap informational
@@ -28,8 +37,12 @@ def configure_device(device):
         print(f"⚙️  Configuring {device.name}")
         device.configure(CONFIG_COMMANDS, error_pattern=[])
 
-        print(f"💾 Saving config on {device.name}")
-        device.execute("write memory")
+        if SAVE_MODE == "defer":
+            print(f"📝 Save deferred for {device.name}")
+            ledger.add(TESTBED_FILE, device.name)
+        else:
+            print(f"💾 Saving config on {device.name}")
+            device.execute("write memory")
 
         device.disconnect()
         print(f"✅ Done: {device.name}")
@@ -43,7 +56,7 @@ def configure_device(device):
 
 
 def main():
-    testbed = loader.load("testbed.yaml")
+    testbed = loader.load(TESTBED_FILE)
 
     start_time = time.time()
 
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Pre-change running-config archive
+
+With SNAPSHOT=1 the push reads `show running-config` in the same session
+before configuring and stores it here. Storage is content addressed:
+
+  config_archive/
+    zdict                 shared zlib dictionary (first snapshot stored)
+    objects/ab/abcd...z   one zlib object per distinct config
+    index.jsonl           {"device", "ts", "sha"} per snapshot
+
+The volatile header lines ("Current configuration : N bytes", "! Last
+configuration change at ...") are dropped before hashing, so a switch
+whose config did not change costs one index line, and thousands of
+near-identical access-switch configs compress against the same
+dictionary.
+
+Lookup for rollback:
+  python netops.py archive list SWITCH
+  python netops.py archive show SWITCH --at 2026-10-01T12:00
+  python config_archive.py show SWITCH > rollback.cfg
+
+Environment:
+  SNAPSHOT=0
+  ARCHIVE_DIR=config_archive
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import bisect
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+
+# ==============================
+# CONFIG
+# ==============================
+SNAPSHOT = os.getenv("SNAPSHOT", "0") == "1"
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "config_archive")
+
+ZDICT_SIZE = 32 * 1024        # zlib uses at most the last 32 KB of a dictionary
+VOLATILE_PREFIXES = (
+    "Building configuration",
+    "Current configuration :",
+    "! Last configuration change",
+    "! NVRAM config last updated",
+    "! No configuration change since last restart",
+)
+
+# ==============================
+# ARCHIVE
+# ==============================
+def strip_volatile(running):
+    lines = [line.rstrip() for line in running.strip().splitlines()]
+    return "\n".join(line for line in lines if not line.startswith(VOLATILE_PREFIXES)) + "\n"
+
+
+class ConfigArchive:
+    """Content-addressed, zlib-compressed running-config snapshots."""
+
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = root
+        self.index_file = os.path.join(root, "index.jsonl")
+        self._lock = threading.Lock()
+        self._zdict = None
+        self._index = None
+
+    # ---------- storage ----------
+    def _object_path(self, sha):
+        return os.path.join(self.root, "objects", sha[:2], f"{sha}.z")
+
+    def _dictionary(self, seed):
+        """The shared dictionary; created from the first config stored."""
+        if self._zdict is None:
+            path = os.path.join(self.root, "zdict")
+            os.makedirs(self.root, exist_ok=True)
+            try:
+                with open(path, "xb") as f:
+                    f.write(seed.encode()[-ZDICT_SIZE:])
+            except FileExistsError:
+                pass
+            with open(path, "rb") as f:
+                self._zdict = f.read()
+        return self._zdict
+
+    def _write_object(self, sha, text):
+        path = self._object_path(sha)
+        if os.path.exists(path):
+            return False
+
+        compressor = zlib.compressobj(9, zdict=self._dictionary(text))
+        data = compressor.compress(text.encode()) + compressor.flush()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return True
+
+    def read(self, sha):
+        with open(self._object_path(sha), "rb") as f:
+            data = f.read()
+        decompressor = zlib.decompressobj(zdict=self._dictionary(""))
+        return (decompressor.decompress(data) + decompressor.flush()).decode()
+
+    # ---------- snapshots ----------
+    def put(self, device_name, running, ts=None):
+        """Archive one snapshot; returns its content hash."""
+        text = strip_volatile(running)
+        sha = hashlib.sha256(text.encode()).hexdigest()
+        ts = ts or time.time()
+
+        self._write_object(sha, text)
+
+        line = json.dumps({"device": device_name, "ts": ts, "sha": sha})
+        with self._lock:
+            with open(self.index_file, "a") as f:
+                f.write(line + "\n")
+            if self._index is not None:
+                bisect.insort(self._index.setdefault(device_name, []), (ts, sha))
+
+        return sha
+
+    def _load_index(self):
+        if self._index is None:
+            index = {}
+            if os.path.isfile(self.index_file):
+                with open(self.index_file) as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue    # torn last line of an aborted run
+                        index.setdefault(entry["device"], []).append((entry["ts"], entry["sha"]))
+            for snapshots in index.values():
+                snapshots.sort()
+            self._index = index
+        return self._index
+
+    def history(self, device_name):
+        """[(ts, sha), ...] oldest first."""
+        with self._lock:
+            return list(self._load_index().get(device_name, []))
+
+    def lookup(self, device_name, at=None):
+        """(ts, sha) of the last snapshot taken at or before `at` (default: now), or None."""
+        snapshots = self.history(device_name)
+        pos = bisect.bisect_right(snapshots, (at if at is not None else float("inf"), "~"))
+        return snapshots[pos - 1] if pos else None
+
+    def stats(self):
+        objects = 0
+        stored = 0
+        for folder, _, files in os.walk(os.path.join(self.root, "objects")):
+            for name in files:
+                objects += 1
+                stored += os.path.getsize(os.path.join(folder, name))
+        snapshots = sum(len(s) for s in self._load_index().values())
+        return {"snapshots": snapshots, "objects": objects, "bytes": stored}
+
+# ==============================
+# CLI
+# ==============================
+def parse_time(text):
+    return datetime.fromisoformat(text).timestamp()
+
+
+def format_time(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Running-config snapshot archive")
+    parser.add_argument("--dir", default=ARCHIVE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", help="snapshots of one device")
+    p.add_argument("device")
+
+    p = sub.add_parser("show", help="print a snapshot (latest, or the one in effect at --at)")
+    p.add_argument("device")
+    p.add_argument("--at", type=parse_time, help="ISO time, e.g. 2026-10-01T12:00")
+
+    sub.add_parser("stats", help="snapshot / object counts and disk use")
+
+    args = parser.parse_args(argv)
+    archive = ConfigArchive(args.dir)
+
+    if args.command == "list":
+        for ts, sha in archive.history(args.device):
+            print(f"{format_time(ts)}  {sha[:16]}")
+
+    elif args.command == "show":
+        found = archive.lookup(args.device, args.at)
+        if found is None:
+            print(f"❌ No snapshot of {args.device}", file=sys.stderr)
+            sys.exit(1)
+        ts, sha = found
+        print(f"! snapshot of {args.device} taken {format_time(ts)} ({sha[:16]})", file=sys.stderr)
+        sys.stdout.write(archive.read(sha))
+
+    else:
+        stats = archive.stats()
+        print(f"Snapshots : {stats['snapshots']}")
+        print(f"Objects   : {stats['objects']} (distinct configs)")
+        print(f"Disk      : {stats['bytes'] / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
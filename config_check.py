@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Running-config compliance checks
+
+missing_lines(running, config) tells which lines of a CONFIG_COMMANDS
+block are not (yet) in a device's `show running-config`. An empty list
+means pushing the block would change nothing.
+
+Rules:
+- lines are compared with whitespace collapsed; "exit", "end" and "!"
+  are ignored
+- indented lines belong to the last top-level line above them
+- ACL entries are compared without sequence numbers
+  ("permit 10.0.0.1" matches " 10 permit 10.0.0.1")
+- "no <cmd>" is satisfied when <cmd> is absent
+- the reset idiom "no ip access-list X" followed by "ip access-list X"
+  with entries requires the ACL to hold exactly those entries, in order
+"""
+
+import re
+from functools import lru_cache
+
+# ==============================
+# CONFIG
+# ==============================
+IGNORED_LINES = {"exit", "end", "!"}
+SEQUENCED_PARENTS = ("ip access-list", "ipv6 access-list", "mac access-list")
+
+SEQ_RE = re.compile(r"^\d+\s+")
+
+# ==============================
+# PARSING
+# ==============================
+def normalize(line):
+    return " ".join(line.split())
+
+
+def parse_blocks(text):
+    """[(parent, [children]), ...] in order; top-level lines without children have []."""
+    blocks = []
+
+    for raw in text.splitlines():
+        if not raw.strip():
+            continue
+
+        line = normalize(raw)
+        if line in IGNORED_LINES or line.startswith("!"):
+            continue
+
+        if raw[0].isspace() and blocks:
+            blocks[-1][1].append(line)
+        else:
+            blocks.append((line, []))
+
+    return blocks
+
+
+def is_sequenced(parent):
+    return parent.startswith(SEQUENCED_PARENTS)
+
+
+def child_key(parent, child):
+    return SEQ_RE.sub("", child) if is_sequenced(parent) else child
+
+
+@lru_cache(maxsize=1024)
+def parse_config(config):
+    """Parsed CONFIG_COMMANDS; cached since one block (or rendered group) is checked against many devices."""
+    return tuple((parent, tuple(children)) for parent, children in parse_blocks(config))
+
+
+def parse_running(running):
+    """{parent: [children]} of a running config (children with seq numbers stripped)."""
+    sections = {}
+    for parent, children in parse_blocks(running):
+        sections.setdefault(parent, []).extend(child_key(parent, c) for c in children)
+    return sections
+
+# ==============================
+# CHECKS
+# ==============================
+def missing_lines(running, config):
+    """
+    Lines of `config` the running config does not satisfy, as
+    "parent" or "parent / child" strings. [] means compliant.
+    """
+    sections = parse_running(running)
+    blocks = parse_config(config)
+    parents = [parent for parent, _ in blocks]
+    missing = []
+
+    for pos, (parent, children) in enumerate(blocks):
+        if parent.startswith("no "):
+            target = parent[3:]
+            if target in parents[pos + 1:]:
+                continue    # reset idiom, checked with the block that re-creates it
+            if target in sections:
+                missing.append(parent)
+            continue
+
+        if parent not in sections:
+            missing.append(parent)
+            missing.extend(f"{parent} / {c}" for c in children if not c.startswith("no "))
+            continue
+
+        present = sections[parent]
+        wanted = [child_key(parent, c) for c in children]
+
+        if f"no {parent}" in parents[:pos] and is_sequenced(parent):
+            if present != wanted:
+                missing.append(f"{parent} / (entries differ: {len(present)} present, {len(wanted)} wanted)")
+            continue
+
+        for child, key in zip(children, wanted):
+            if key.startswith("no "):
+                if key[3:] in present:
+                    missing.append(f"{parent} / {child}")
+            elif key not in present:
+                missing.append(f"{parent} / {child}")
+
+    return missing
+
+
+def is_compliant(running, config):
+    return not missing_lines(running, config)
@@ -3,9 +3,10 @@
 import os
 import sys
 import time
-from pyats.topology import loader
-from pyats.async_ import pcall
-from tabulate import tabulate
+import argparse
+
+# The push engine (pyATS, tabulate) is imported after the parameter checks
+# below, so a job with missing parameters fails without loading them
 
 # ==========================================================
 # Required Jenkins parameters
@@ -37,80 +38,146 @@ for tb in TESTBED_FILES:
         print(f"❌ Testbed file not found: {tb}")
         sys.exit(1)
 
-# ==========================================================
-# Per-device worker (parallel)
-# ==========================================================
-
-def run_on_device(device):
-    try:
-        device.connect(
-            learn_hostname=True,
-            init_exec_commands=[],
-            init_config_commands=[]
-        )
-
-        device.configure(CONFIG_COMMANDS)
-        device.execute("write memory")
-
-        print(f"[OK] {device.name}")
-        return (device.name, "OK")
-
-    except Exception as e:
-        print(f"[ERROR] {device.name}: {e}")
-        return (device.name, "NOT OK")
-
-    finally:
-        if device.connected:
-            device.disconnect()
+from push_engine import (
+    PUSH_ENGINE, MAX_IN_FLIGHT, PRECHECK, VERIFY, SAVE_MODE, ROLLOUT_WAVES, WAVE_MAX_ERROR_PCT,
+    SITE_MAX_IN_FLIGHT, SITE_LIMITS,
+    NOT_RUN_STATUSES, NOTHING_TO_PUSH, merge_testbeds, push, push_waves, preflight_targets, resume_targets, print_report,
+)
+from reachability import PREFLIGHT
+from push_journal import RESUME, PushJournal, config_hash
+from push_results import parse_shard, shard_targets, results_file, write_results
+from bulk_config import BULK_MODE
+from config_archive import SNAPSHOT
+from config_render import RENDER_FAILED, is_template, render_all, group_configs
 
 # ==========================================================
-# Execution report
+# Main
 # ==========================================================
 
-def print_report(results):
-    table = []
-    ok_count = 0
-    fail_count = 0
+def parse_args():
+    parser = argparse.ArgumentParser(description="Push CONFIG_COMMANDS to the TESTBEDS devices")
+    parser.add_argument(
+        "--resume", action="store_true", default=RESUME,
+        help="skip devices the push journal has as done for this config (or RESUME=1)",
+    )
+    parser.add_argument(
+        "--shard", default=os.getenv("SHARD"), metavar="i/N",
+        help="push only shard i of N (device name hash), for several agents (or SHARD=i/N)",
+    )
+    parser.add_argument(
+        "--results", metavar="FILE",
+        help="write the results as JSON (default with --shard: push_results_shard<i>of<N>.json)",
+    )
+    args = parser.parse_args()
+
+    if args.shard:
+        try:
+            args.shard = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        args.results = args.results or results_file(*args.shard)
+    return args
 
-    for device, status in results:
-        table.append([device, status])
-        if status == "OK":
-            ok_count += 1
-        else:
-            fail_count += 1
-
-    print("\n================ Execution Report ================\n")
-    print(tabulate(table, headers=["Device", "Status"], tablefmt="grid"))
-    print(f"\nSuccess: {ok_count}")
-    print(f"Failed : {fail_count}")
-    print("==================================================")
-
-# ==========================================================
-# Main
-# ==========================================================
 
 def main():
+    args = parse_args()
     start_time = time.time()
-    all_results = []
 
     print("\n🔧 Configuration to be pushed:")
     print("--------------------------------------------------")
     print(CONFIG_COMMANDS)
     print("--------------------------------------------------")
 
-    for tb_file in TESTBED_FILES:
-        print(f"\n🚀 Running on testbed: {tb_file}")
-        testbed = loader.load(tb_file)
+    # All selected testbeds go through one global scheduler
+    targets, duplicates = merge_testbeds(TESTBED_FILES)
+
+    # Every agent derives the same split from the same testbeds
+    if args.shard:
+        total = len(targets)
+        targets = shard_targets(targets, *args.shard)
+        print(f"\n🧱 Shard {args.shard[0]}/{args.shard[1]}: {len(targets)} of {total} devices")
+
+    print(
+        f"\n🚀 Running on {len(targets)} devices from {len(TESTBED_FILES)} testbed(s): "
+        f"{', '.join(TESTBED_FILES)}"
+    )
+    print(
+        f"   engine={PUSH_ENGINE}, max in flight={MAX_IN_FLIGHT}, "
+        f"precheck={'on' if PRECHECK else 'off'}, verify={'on' if VERIFY else 'off'}, "
+        f"save={SAVE_MODE}, bulk={BULK_MODE}, "
+        f"snapshot={'on' if SNAPSHOT else 'off'}, "
+        f"duplicates skipped={len(duplicates)}"
+    )
+
+    if SITE_MAX_IN_FLIGHT or SITE_LIMITS:
+        print(f"   per-site max in flight={SITE_MAX_IN_FLIGHT or MAX_IN_FLIGHT}, site limits={SITE_LIMITS or '-'}")
+
+    # A Jinja CONFIG_COMMANDS is rendered per device; each distinct result is shown once
+    config = CONFIG_COMMANDS
+    render_failed = []
+    nothing_to_push = []
+    if is_template(CONFIG_COMMANDS):
+        config, errors = render_all(CONFIG_COMMANDS, targets)
+        render_failed = [
+            {"testbed": tb_file, "device": device.name, "status": RENDER_FAILED}
+            for tb_file, device in targets if device.name in errors
+        ]
+        targets = [(tb_file, device) for tb_file, device in targets if device.name in config]
+        for name, error in errors.items():
+            print(f"[{RENDER_FAILED}] {name}: {error}")
+
+        # A template that renders to nothing for a device (e.g. an {% if %}
+        # for another site) must not connect, configure and write memory
+        nothing_to_push = [
+            {"testbed": tb_file, "device": device.name, "status": NOTHING_TO_PUSH}
+            for tb_file, device in targets if not config[device.name].strip()
+        ]
+        targets = [(tb_file, device) for tb_file, device in targets if config[device.name].strip()]
+        config = {name: block for name, block in config.items() if block.strip()}
+        if nothing_to_push:
+            print(f"[{NOTHING_TO_PUSH}] {len(nothing_to_push)} device(s): template rendered empty")
+
+        groups = group_configs(config)
+        print(f"\n🧩 Template rendered for {len(config)} device(s): {len(groups)} distinct config(s)")
+        for block, names in groups.items():
+            print(f"--- {len(names)} device(s): {', '.join(names[:5])}{' ...' if len(names) > 5 else ''}")
+            print(block.rstrip())
+        print("--------------------------------------------------")
+
+    # Every outcome is journaled, so an aborted job can be re-run with --resume
+    journal = PushJournal()
+    resumed = []
+    if args.resume:
+        targets, resumed = resume_targets(targets, config, journal)
+        print(f"   resume: {len(resumed)} device(s) already done, {len(targets)} left")
+
+    # Dead switches are reported without holding a push slot for a connect timeout
+    unreachable = []
+    if PREFLIGHT:
+        targets, unreachable = preflight_targets(targets)
+
+    if ROLLOUT_WAVES:
+        print(f"   waves={ROLLOUT_WAVES}, max wave error={WAVE_MAX_ERROR_PCT:g}%")
+        results = push_waves(targets, config, journal=journal)
+    else:
+        results = push(targets, config, journal=journal)
+
+    results = render_failed + nothing_to_push + resumed + unreachable + results
+
+    print_report(results, duplicates)
+    print(f"\n⏱️ Total runtime: {time.time() - start_time:.2f} seconds")
 
-        results = pcall(
-            run_on_device,
-            device=testbed.devices.values()
+    if args.results:
+        write_results(
+            args.results, results, duplicates,
+            shard="/".join(map(str, args.shard)) if args.shard else None,
+            config_id=config_hash(CONFIG_COMMANDS),
+            runtime=round(time.time() - start_time, 2),
         )
 
-        all_results.extend(results)
-
-    print_report(all_results)
-    print(f"\n⏱️ Total runtime: {time.time() - start_time:.2f} seconds")
+    # A push stopped by the wave gate or the circuit breaker fails the Jenkins build
+    if any(r["status"] in NOT_RUN_STATUSES for r in results):
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
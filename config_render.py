@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Per-device config templates
+
+When CONFIG_COMMANDS contains Jinja markup ({{ ... }} / {% ... %}) it
+is rendered once per device instead of being pushed as is. Variables:
+
+  name, alias, os, ip, testbed      from the testbed device
+  custom                            testbed `custom` fields (net_location, net_type, ...)
+  inv                               the device's inventory record (dev_ prefix dropped)
+                                    from INVENTORY_FILES, e.g. inv.model
+
+Example:
+  logging source-interface {{ "Vlan1" if custom.net_type.startswith("access") else "Loopback0" }}
+  {% if custom.net_location == "vlab" %}snmp-server host 192.168.1.254 version 2c public{% endif %}
+
+Undefined variables are errors, so a device missing a field is reported
+as "RENDER FAILED" instead of getting a half-empty config. Large fleets
+are rendered on a process pool; each worker compiles the template once.
+group_configs() groups devices by rendered config, so work per distinct
+config (printing, hashing, precheck parsing) is done once.
+
+Environment:
+  INVENTORY_FILES=          comma separated inventory_*.json files
+  RENDER_WORKERS=<cpus>
+  RENDER_MIN_PARALLEL=200   fewer devices are rendered in-process
+"""
+
+import os
+import json
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+# ==============================
+# CONFIG
+# ==============================
+INVENTORY_FILES = [f.strip() for f in os.getenv("INVENTORY_FILES", "").split(",") if f.strip()]
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(os.cpu_count() or 1)))
+RENDER_MIN_PARALLEL = int(os.getenv("RENDER_MIN_PARALLEL", "200"))
+
+TEMPLATE_MARKERS = ("{{", "{%")
+RENDER_FAILED = "RENDER FAILED"
+
+# ==============================
+# CONTEXT
+# ==============================
+def is_template(text):
+    return any(marker in text for marker in TEMPLATE_MARKERS)
+
+
+def load_inventory(files=INVENTORY_FILES):
+    """{dev_name: record} from inventory_*.json files, keys without "dev_"."""
+    inventory = {}
+    for path in files:
+        with open(path) as f:
+            for record in json.load(f)["inventory"]:
+                inventory[record["dev_name"]] = {
+                    key[4:] if key.startswith("dev_") else key: value
+                    for key, value in record.items()
+                }
+    return inventory
+
+
+def device_context(tb_file, device, inventory):
+    """Plain dict (picklable) with everything a template may use."""
+    try:
+        ip = str(device.connections["cli"]["ip"])
+    except (KeyError, TypeError, AttributeError):
+        ip = None
+
+    return {
+        "name": device.name,
+        "alias": getattr(device, "alias", device.name),
+        "os": getattr(device, "os", None),
+        "ip": ip,
+        "testbed": tb_file,
+        "custom": dict(getattr(device, "custom", None) or {}),
+        "inv": inventory.get(device.name, {}),
+    }
+
+# ==============================
+# RENDER
+# ==============================
+@lru_cache(maxsize=16)
+def compile_template(source):
+    import jinja2
+
+    env = jinja2.Environment(
+        undefined=jinja2.StrictUndefined,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True,
+    )
+    return env.from_string(source)
+
+
+def render_one(job):
+    """(source, context) -> (device name, config or None, error or None)."""
+    source, context = job
+    try:
+        return (context["name"], compile_template(source).render(**context), None)
+    except Exception as e:
+        return (context["name"], None, f"{type(e).__name__}: {e}")
+
+
+def render_all(source, targets, inventory=None, workers=RENDER_WORKERS):
+    """
+    Render `source` for [(testbed file, device), ...].
+    Returns ({device name: config}, {device name: error}). A config may
+    be empty (an {% if %} that does not apply to the device); callers
+    report those devices instead of pushing to them.
+    """
+    compile_template(source)      # syntax errors fail the whole push, before any worker starts
+
+    inventory = load_inventory() if inventory is None else inventory
+    jobs = [(source, device_context(tb_file, device, inventory)) for tb_file, device in targets]
+
+    if workers > 1 and len(jobs) >= RENDER_MIN_PARALLEL:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = list(pool.map(render_one, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        rendered = [render_one(job) for job in jobs]
+
+    configs = {}
+    failed = {}
+    for name, config, error in rendered:
+        if error:
+            failed[name] = error
+        else:
+            configs[name] = config
+
+    return configs, failed
+
+
+def group_configs(configs):
+    """{rendered config: [device names]}, biggest group first."""
+    groups = {}
+    for name, config in configs.items():
+        groups.setdefault(config, []).append(name)
+    return dict(sorted(groups.items(), key=lambda item: -len(item[1])))
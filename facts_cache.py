@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Persistent platform facts cache (chassis serial + PID)
+
+device.learn("platform") runs several show commands just to get values
+that almost never change. FactsCache keeps them on disk, keyed by
+testbed and device, so only cache misses pay for the learn.
+
+An entry is dropped when:
+- it is older than FACTS_TTL_HOURS
+- the testbed now declares a different model / platform / address
+- FACTS_VERIFY=1 (default) and one cheap `show version | include`
+  reports a different serial or model than the cached one
+
+Environment:
+  FACTS_CACHE_FILE=platform_facts_cache.json
+  FACTS_TTL_HOURS=168
+  FACTS_VERIFY=1
+"""
+
+import os
+import re
+import json
+import time
+import threading
+
+# ==============================
+# CONFIG
+# ==============================
+FACTS_CACHE_FILE = os.getenv("FACTS_CACHE_FILE", "platform_facts_cache.json")
+FACTS_TTL_HOURS = float(os.getenv("FACTS_TTL_HOURS", "168"))
+FACTS_VERIFY = os.getenv("FACTS_VERIFY", "1") == "1"
+
+VERIFY_COMMAND = "show version | include Model [Nn]umber|System [Ss]erial [Nn]umber"
+
+# ==============================
+# HELPERS
+# ==============================
+def device_fingerprint(device):
+    """What the testbed says about the device; a change invalidates the entry."""
+    cli = device.connections.get("cli", {})
+    return "|".join(str(v) for v in (
+        getattr(device, "model", None) or "",
+        getattr(device, "platform", None) or "",
+        cli.get("ip", ""),
+    ))
+
+
+def parse_version_facts(output: str):
+    """(model, serial) from `show version | include ...`, first (active) member wins."""
+    model = serial = None
+
+    for line in output.splitlines():
+        if model is None:
+            m = re.match(r"\s*Model [Nn]umber\s*:\s*(\S+)", line)
+            if m:
+                model = m.group(1)
+        if serial is None:
+            m = re.match(r"\s*System [Ss]erial [Nn]umber\s*:\s*(\S+)", line)
+            if m:
+                serial = m.group(1)
+
+    return model, serial
+
+# ==============================
+# CACHE
+# ==============================
+class FactsCache:
+    """
+    {"<testbed>/<device>": {"pid", "serial", "fingerprint", "cached_at"}}
+
+    Thread-safe; collectors share one instance across their worker pool
+    and call save() once at the end of the run.
+    """
+
+    def __init__(self, path=FACTS_CACHE_FILE, ttl_hours=FACTS_TTL_HOURS):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+
+        if os.path.isfile(path):
+            try:
+                with open(path) as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Ignoring unreadable facts cache {path}: {e}")
+
+    @staticmethod
+    def key(testbed_name, device):
+        return f"{testbed_name}/{device.name}"
+
+    def get(self, testbed_name, device):
+        """Cached entry if it is fresh and the testbed still agrees, else None."""
+        key = self.key(testbed_name, device)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if time.time() - entry["cached_at"] > self.ttl \
+                    or entry.get("fingerprint") != device_fingerprint(device):
+                del self._entries[key]
+                self.invalidated += 1
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return dict(entry)
+
+    def put(self, testbed_name, device, pid, serial):
+        if pid in (None, "", "N/A") or serial in (None, "", "N/A"):
+            return
+        with self._lock:
+            self._entries[self.key(testbed_name, device)] = {
+                "pid": pid,
+                "serial": serial,
+                "fingerprint": device_fingerprint(device),
+                "cached_at": time.time(),
+            }
+
+    def invalidate(self, testbed_name, device):
+        """Entry turned out to be stale (hit was counted, so undo it)."""
+        with self._lock:
+            if self._entries.pop(self.key(testbed_name, device), None) is not None:
+                self.invalidated += 1
+                self.hits -= 1
+                self.misses += 1
+
+    def save(self):
+        with self._lock:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(self._entries, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+
+    def summary(self):
+        return (
+            f"facts cache: {self.hits} hits, {self.misses} misses "
+            f"({self.invalidated} invalidated)"
+        )
+
+
+def cached_platform_facts(cache, testbed_name, device, learn, execute=None):
+    """
+    (pid, serial) for a connected device.
+
+    `learn()` is the expensive path and must return (pid, serial); it only
+    runs on a cache miss. With FACTS_VERIFY, `execute(command)` is used for
+    one cheap check of a cache hit against the live serial / model.
+    """
+    entry = cache.get(testbed_name, device)
+
+    if entry is not None and FACTS_VERIFY and execute is not None:
+        model, serial = parse_version_facts(execute(VERIFY_COMMAND))
+        if (model and model != entry["pid"]) or (serial and serial != entry["serial"]):
+            print(f"♻️ Platform of {device.name} changed, relearning")
+            cache.invalidate(testbed_name, device)
+            entry = None
+
+    if entry is not None:
+        return entry["pid"], entry["serial"]
+
+    pid, serial = learn()
+    cache.put(testbed_name, device, pid, serial)
+    return pid, serial
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Simulated IOS / IOS-XE fleet for push benchmarks
+
+Serves any number of mock switches over SSH on this machine, so the
+config push can be measured at scale without touching production.
+Every device has its own loopback address (127.10.x.y) on the same TCP
+port; the address a client connects to selects the device. A mock
+switch understands enough CLI for unicon and the push engine:
+
+  prompt / enable mode, terminal settings, configure terminal,
+  config sub-modes (exit / end), show running-config, show version,
+  `| include` / `| exclude` filters, write memory
+
+with configurable delays:
+
+  MOCK_PROMPT_S=0.05   before every prompt
+  MOCK_LINE_S=0.02     per config line
+  MOCK_WRITE_S=1.0     write memory
+
+Run:
+  python mock_fleet.py testbed 1000 -o mock_testbed.yaml
+  python mock_fleet.py serve 1000
+  TESTBEDS=mock_testbed.yaml CONFIG_COMMANDS="logging host 10.0.0.1" python config_parallel__access-05.py
+
+Linux only (the whole 127.0.0.0/8 is routed to lo).
+"""
+
+import os
+import re
+import sys
+import time
+import socket
+import argparse
+import threading
+
+# ==============================
+# CONFIG
+# ==============================
+MOCK_PORT = int(os.getenv("MOCK_PORT", "10022"))
+MOCK_USERNAME = "admin"
+MOCK_PASSWORD = "cisco"
+MOCK_SITES = int(os.getenv("MOCK_SITES", "10"))
+
+MOCK_PROMPT_S = float(os.getenv("MOCK_PROMPT_S", "0.05"))
+MOCK_LINE_S = float(os.getenv("MOCK_LINE_S", "0.02"))
+MOCK_WRITE_S = float(os.getenv("MOCK_WRITE_S", "1.0"))
+
+SUBMODES = {
+    "interface": "config-if",
+    "ip access-list": "config-std-nacl",
+    "line": "config-line",
+    "router": "config-router",
+    "vlan": "config-vlan",
+}
+GLOBAL_COMMANDS = ("hostname", "logging", "snmp-server", "ntp", "username", "aaa", "ip ", "no ", "service")
+
+BASE_CONFIG = """\
+version 17.9
+service timestamps debug datetime msec
+hostname {name}
+!
+interface Vlan1
+ ip address {ip} 255.255.255.0
+!
+{ports}line vty 0 4
+ transport input ssh
+!
+end
+"""
+
+# What unicon's IOS-XE plugin reads while connecting (operating mode) and
+# facts_cache.py reads for the model / serial
+SHOW_VERSION = """\
+Cisco IOS XE Software, Version 17.09.04a
+Cisco IOS Software [Cupertino], Catalyst L3 Switch Software (CAT9K_LITE_IOSXE), Version 17.9.4a, RELEASE SOFTWARE (fc3)
+Technical Support: http://www.cisco.com/techsupport
+Copyright (c) 1986-2023 by Cisco Systems, Inc.
+
+ROM: IOS-XE ROMMON
+BOOTLDR: System Bootstrap, Version 17.9.1r, RELEASE SOFTWARE (P)
+
+{name} uptime is 1 week, 2 days, 3 hours, 4 minutes
+Uptime for this control processor is 1 week, 2 days, 3 hours, 6 minutes
+System returned to ROM by Reload Command
+System image file is "flash:packages.conf"
+Last reload reason: Reload Command
+
+cisco C9200CX-8P-2X2G (ARM64) processor with 1255483K/6147K bytes of memory.
+Processor board ID {serial}
+Router operating mode: Autonomous
+8 Gigabit Ethernet interfaces
+2 Ten Gigabit Ethernet interfaces
+
+Switch Ports Model              SW Version        SW Image              Mode
+------ ----- -----              ----------        ----------            ----
+*    1 12    C9200CX-8P-2X2G    17.09.04a         CAT9K_LITE_IOSXE      INSTALL
+
+Model Number                       : C9200CX-8P-2X2G
+System Serial Number               : {serial}
+
+Configuration register is 0x102
+"""
+
+# ==============================
+# ADDRESSING
+# ==============================
+def device_ip(index):
+    return f"127.10.{index // 250}.{index % 250 + 1}"
+
+
+def device_index(ip):
+    _, _, high, low = (int(part) for part in ip.split("."))
+    return high * 250 + low - 1
+
+
+def device_name(index):
+    return f"mock-sw{index:05d}"
+
+# ==============================
+# TESTBED
+# ==============================
+def write_testbed(count, path, port=MOCK_PORT):
+    """Testbed YAML for `count` mock devices, spread over MOCK_SITES sites."""
+    lines = [
+        "---",
+        "testbed:",
+        "  name: mock-fleet",
+        "  credentials:",
+        "    default:",
+        f"      username: {MOCK_USERNAME}",
+        f"      password: {MOCK_PASSWORD}",
+        "    enable:",
+        f"      password: {MOCK_PASSWORD}",
+        "",
+        "devices:",
+    ]
+    for index in range(count):
+        name = device_name(index)
+        lines += [
+            f"  {name}:",
+            f"    alias: {name}",
+            "    os: iosxe",
+            "    type: switch",
+            "    connections:",
+            "      cli:",
+            "        protocol: ssh",
+            f"        ip: {device_ip(index)}",
+            f"        port: {port}",
+            "        ssh_options: -o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null",
+            "    custom:",
+            f"      net_location: mock-site{index % MOCK_SITES:02d}",
+            "      net_type: access-mock",
+            "      netmiko_driver: cisco_ios",
+        ]
+
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    print(f"✅ {count} mock devices written to {path}")
+
+# ==============================
+# MOCK CLI
+# ==============================
+class MockSwitch:
+    """CLI state of one device; survives reconnects while the server runs."""
+
+    def __init__(self, index):
+        self.name = device_name(index)
+        ports = "".join(
+            f"interface GigabitEthernet1/0/{p}\n switchport access vlan 10\n!\n" for p in range(1, 9)
+        )
+        self.running = BASE_CONFIG.format(name=self.name, ip=device_ip(index), ports=ports)
+        self.serial = f"MOCK{index:07d}"
+        self.lock = threading.Lock()
+
+    def add_config(self, parent, line):
+        with self.lock:
+            lines = self.running.splitlines()[:-1]      # without "end"
+
+            if parent:
+                if parent not in lines:
+                    lines += [parent, "!"]
+                pos = lines.index(parent) + 1
+                while pos < len(lines) and lines[pos].startswith(" "):
+                    pos += 1
+                lines.insert(pos, f" {line}")
+
+            elif line.startswith("no "):
+                # Drop the command with its sub-commands; `no` of a missing
+                # command is accepted and changes nothing, like on IOS
+                if line[3:] in lines:
+                    pos = lines.index(line[3:])
+                    end = pos + 1
+                    while end < len(lines) and lines[end].startswith(" "):
+                        end += 1
+                    del lines[pos:end]
+
+            elif line not in lines:
+                lines.append(line)
+
+            self.running = "\n".join(lines + ["end"]) + "\n"
+
+
+class CliSession:
+    def __init__(self, switch, channel):
+        self.switch = switch
+        self.channel = channel
+        self.mode = "exec"          # exec | config | config-xxx
+        self.parent = None
+
+    def prompt(self):
+        time.sleep(MOCK_PROMPT_S)
+        suffix = "#" if self.mode == "exec" else f"({self.mode})#"
+        self.channel.sendall(f"\r\n{self.switch.name}{suffix}")
+
+    def send(self, text):
+        self.channel.sendall(text.replace("\n", "\r\n"))
+
+    def handle(self, line):
+        command = " ".join(line.split())
+
+        if self.mode == "exec":
+            self.exec_command(command)
+        elif command in ("end", "\x1a"):
+            self.mode, self.parent = "exec", None
+        elif command == "exit":
+            if self.parent:
+                self.mode, self.parent = "config", None
+            else:
+                self.mode = "exec"
+        elif command:
+            time.sleep(MOCK_LINE_S)
+            if command.startswith(tuple(SUBMODES)):
+                self.switch.add_config(None, command)
+                self.parent = command
+                self.mode = next(m for p, m in SUBMODES.items() if command.startswith(p))
+            elif self.parent and not command.startswith(GLOBAL_COMMANDS):
+                self.switch.add_config(self.parent, command)
+            else:
+                # Like IOS: a global command leaves the sub-mode
+                self.switch.add_config(None, command)
+                self.mode, self.parent = "config", None
+
+    def exec_command(self, command):
+        if not command or command.startswith(("terminal", "enable", "delete")):
+            return
+
+        # show ... | include / exclude <regex>
+        command, _, pipe = command.partition(" | ")
+        output = None
+
+        if command in ("configure terminal", "config term", "conf t", "config t"):
+            self.send("\nEnter configuration commands, one per line.  End with CNTL/Z.")
+            self.mode = "config"
+        elif command in ("write memory", "wr", "copy running-config startup-config"):
+            time.sleep(MOCK_WRITE_S)
+            self.send("\nBuilding configuration...\n[OK]")
+        elif command.startswith("show run"):
+            output = (f"Building configuration...\n\nCurrent configuration : "
+                      f"{len(self.switch.running)} bytes\n{self.switch.running}")
+        elif command.startswith("show ver"):
+            output = SHOW_VERSION.format(name=self.switch.name, serial=self.switch.serial)
+        else:
+            self.send("\n% Invalid input detected at '^' marker.")
+
+        if output is None:
+            return
+        if pipe:
+            keyword, _, pattern = pipe.partition(" ")
+            keep = not "exclude".startswith(keyword)
+            output = "\n".join(
+                line for line in output.splitlines() if bool(re.search(pattern, line)) == keep
+            )
+        self.send(f"\n{output.rstrip()}" if output.strip() else "")
+
+    def run(self):
+        self.prompt()
+        buffer = ""
+        while True:
+            data = self.channel.recv(4096)
+            if not data:
+                return
+            buffer += data.decode(errors="replace")
+            while "\r" in buffer or "\n" in buffer:
+                cut = min(i for i in (buffer.find("\r"), buffer.find("\n")) if i >= 0)
+                line, buffer = buffer[:cut], buffer[cut + 1:].lstrip("\n")
+                self.channel.sendall(line)          # echo, like a terminal
+                self.handle(line)
+                self.prompt()
+
+# ==============================
+# SSH SERVER
+# ==============================
+def make_server_interface():
+    import paramiko
+
+    class MockServer(paramiko.ServerInterface):
+        def check_auth_password(self, username, password):
+            if username == MOCK_USERNAME and password == MOCK_PASSWORD:
+                return paramiko.AUTH_SUCCESSFUL
+            return paramiko.AUTH_FAILED
+
+        def get_allowed_auths(self, username):
+            return "password"
+
+        def check_channel_request(self, kind, chanid):
+            return paramiko.OPEN_SUCCEEDED if kind == "session" else paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+        def check_channel_pty_request(self, *args):
+            return True
+
+        def check_channel_shell_request(self, channel):
+            return True
+
+        def check_channel_exec_request(self, channel, command):
+            return False
+
+    return MockServer
+
+
+def serve_client(sock, switches, host_key, server_class):
+    import paramiko
+
+    ip = sock.getsockname()[0]
+    switch = switches.get(device_index(ip)) if ip.startswith("127.10.") else None
+    if switch is None:
+        sock.close()
+        return
+
+    transport = paramiko.Transport(sock)
+    transport.add_server_key(host_key)
+    try:
+        transport.start_server(server=server_class())
+        channel = transport.accept(30)
+        if channel is not None:
+            CliSession(switch, channel).run()
+    except Exception:
+        pass
+    finally:
+        transport.close()
+
+
+def serve(count, port=MOCK_PORT, ready=None):
+    """Serve `count` mock switches until interrupted."""
+    import logging
+    import paramiko
+
+    # TCP preflight probes close before the SSH banner; paramiko logs each one
+    logging.getLogger("paramiko").setLevel(logging.CRITICAL)
+
+    host_key = paramiko.RSAKey.generate(2048)
+    server_class = make_server_interface()
+    switches = {index: MockSwitch(index) for index in range(count)}
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(("0.0.0.0", port))
+    listener.listen(1024)
+
+    print(
+        f"🧪 Mock fleet: {count} devices on {device_ip(0)}..{device_ip(count - 1)}:{port} "
+        f"(prompt {MOCK_PROMPT_S}s, line {MOCK_LINE_S}s, write {MOCK_WRITE_S}s)",
+        flush=True,
+    )
+    if ready:
+        ready.set()
+
+    while True:
+        sock, _ = listener.accept()
+        threading.Thread(
+            target=serve_client, args=(sock, switches, host_key, server_class), daemon=True
+        ).start()
+
+# ==============================
+# MAIN
+# ==============================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulated IOS-XE fleet over SSH")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("testbed", help="write a testbed YAML for the mock fleet")
+    p.add_argument("count", type=int)
+    p.add_argument("-o", "--output", default="mock_testbed.yaml")
+    p.add_argument("--port", type=int, default=MOCK_PORT)
+
+    p = sub.add_parser("serve", help="run the mock devices")
+    p.add_argument("count", type=int)
+    p.add_argument("--port", type=int, default=MOCK_PORT)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "testbed":
+        write_testbed(args.count, args.output, args.port)
+    else:
+        try:
+            serve(args.count, args.port)
+        except KeyboardInterrupt:
+            sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+netops - single entry point for the collectors and the config push
+
+Only the standard library is imported at start-up. Each subcommand
+checks its own parameters first and then imports what it needs:
+netmiko/requests when it connects, pyATS when it loads a testbed,
+Genie only when a device is learned, pandas/tabulate only when the
+report is written.
+
+Run:
+  python netops.py ports                          # netmiko + LibreNMS (ssh_ports_parallel.py)
+  python netops.py pyats-ports -t testbed.yaml    # pyats_ports_parallel.py
+  python netops.py pyats-inventory -t testbed.yaml
+  python netops.py push -c config_commands.txt -T testbed_access_9200.yaml
+  python netops.py push -c config_commands.txt -T testbed_access_9200.yaml --resume
+  python netops.py save                           # write memory on devices pushed with SAVE_MODE=defer
+  python netops.py push -c config_commands.txt -T a.yaml,b.yaml --shard 2/4   # one of 4 agents
+  python netops.py merge push_results_shard*.json                  # one report for all shards
+  python netops.py scan -T testbed_access_9200.yaml   # compliance rules on cached running configs
+  python netops.py archive show SWITCH --at 2026-10-01T12:00   # pre-change snapshot (SNAPSHOT=1)
+"""
+
+import os
+import sys
+import argparse
+import importlib
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ==============================
+# HELPERS
+# ==============================
+def fail(message):
+    print(f"❌ {message}")
+    sys.exit(1)
+
+
+def load_script(name):
+    """Import one of the scripts next to this file (hyphenated names work too)."""
+    if HERE not in sys.path:
+        sys.path.insert(0, HERE)
+    return importlib.import_module(name)
+
+
+def run_script(filename, argv=()):
+    """Run a script as __main__, e.g. the Jenkins push entry point."""
+    import runpy
+
+    sys.argv = [filename, *argv]
+    runpy.run_path(os.path.join(HERE, filename), run_name="__main__")
+
+
+def require_file(path):
+    if not os.path.isfile(path):
+        fail(f"File not found: {path}")
+
+# ==============================
+# SUBCOMMANDS
+# ==============================
+def cmd_ports(args):
+    if not os.getenv("LIBRENMS_TOKEN"):
+        fail("LIBRENMS_TOKEN not set (export LIBRENMS_TOKEN=...)")
+
+    collector = load_script("ssh_ports_parallel")
+    if args.input:
+        require_file(args.input)
+    collector.main(args.input)
+
+
+def cmd_pyats_ports(args, module="pyats_ports_parallel"):
+    require_file(args.testbed)
+
+    collector = load_script(module)
+    collector.TESTBED_FILE = args.testbed
+    collector.main()
+
+
+def cmd_pyats_inventory(args):
+    cmd_pyats_ports(args, module="pyats_ports_parallel-02")
+
+
+def cmd_push(args):
+    if args.config_file:
+        require_file(args.config_file)
+        with open(args.config_file) as f:
+            os.environ["CONFIG_COMMANDS"] = f.read()
+    if args.testbeds:
+        os.environ["TESTBEDS"] = args.testbeds
+
+    # Same checks as the Jenkins entry point, before anything is imported
+    if not os.getenv("CONFIG_COMMANDS", "").strip():
+        fail("CONFIG_COMMANDS is not set or empty (use -c FILE)")
+    if not os.getenv("TESTBEDS", "").strip():
+        fail("TESTBEDS is not set or empty (use -T a.yaml,b.yaml)")
+
+    extra = list(args.extra)
+    if args.resume:
+        extra.insert(0, "--resume")
+    if args.shard:
+        extra[:0] = ["--shard", args.shard]
+    run_script("config_parallel__access-05.py", extra)
+
+
+def cmd_save(args):
+    saver = load_script("save_ledger")
+    ledger = saver.SaveLedger(args.ledger)
+
+    if args.list:
+        for name, entry in sorted(ledger.pending().items()):
+            print(f"{name:<30} {entry['testbed']:<40} pushes={entry['pushes']}")
+        return
+
+    saver.main(ledger, args.max_in_flight)
+
+
+def cmd_merge(args):
+    for path in args.files:
+        require_file(path)
+    load_script("push_results").main(args.files)
+
+
+def cmd_scan(args):
+    argv = ["-r", args.rules] if args.rules else []
+    if args.testbeds:
+        argv += ["-T", args.testbeds]
+    if args.ttl is not None:
+        argv += ["--ttl", str(args.ttl)]
+    if args.json:
+        argv += ["--json", args.json]
+    argv += ["--refresh"] * args.refresh + ["--cached-only"] * args.cached_only
+
+    load_script("compliance_scan").main(argv)
+
+
+def cmd_archive(args):
+    argv = ["--dir", args.dir] if args.dir else []
+    load_script("config_archive").main(argv + args.extra)
+
+# ==============================
+# MAIN
+# ==============================
+def build_parser():
+    parser = argparse.ArgumentParser(prog="netops", description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("ports", help="netmiko port utilization for LibreNMS devices")
+    p.add_argument("-i", "--input", help="input Excel with a 'hostname' column")
+    p.set_defaults(func=cmd_ports)
+
+    p = sub.add_parser("pyats-ports", help="pyATS port utilization")
+    p.add_argument("-t", "--testbed", default="testbed.yaml")
+    p.set_defaults(func=cmd_pyats_ports)
+
+    p = sub.add_parser("pyats-inventory", help="pyATS port utilization + serial / PID")
+    p.add_argument("-t", "--testbed", default="testbed.yaml")
+    p.set_defaults(func=cmd_pyats_inventory)
+
+    p = sub.add_parser("push", help="config push (Jenkins entry point)")
+    p.add_argument("-c", "--config-file", help="file with the commands (default: $CONFIG_COMMANDS)")
+    p.add_argument("-T", "--testbeds", help="comma separated testbed files (default: $TESTBEDS)")
+    p.add_argument("--resume", action="store_true", help="skip devices already done for this config (push journal)")
+    p.add_argument("--shard", metavar="i/N", help="push only shard i of N, results in push_results_shard<i>of<N>.json")
+    p.add_argument("extra", nargs=argparse.REMAINDER, help="passed to the push script")
+    p.set_defaults(func=cmd_push)
+
+    p = sub.add_parser("save", help="write memory on every device pushed with SAVE_MODE=defer")
+    p.add_argument("--ledger", default=os.getenv("SAVE_LEDGER_FILE", "pending_saves.jsonl"))
+    p.add_argument("-j", "--max-in-flight", type=int, default=int(os.getenv("SAVE_MAX_IN_FLIGHT", "200")))
+    p.add_argument("-l", "--list", action="store_true", help="only list the pending devices")
+    p.set_defaults(func=cmd_save)
+
+    p = sub.add_parser("merge", help="one execution report from sharded push result files")
+    p.add_argument("files", nargs="+", help="push_results_shard*.json")
+    p.set_defaults(func=cmd_merge)
+
+    p = sub.add_parser("scan", help="read-only compliance scan (cached running configs)")
+    p.add_argument("-T", "--testbeds", help="comma separated testbed files (default: $TESTBEDS)")
+    p.add_argument("-r", "--rules", help="rules file (default: compliance_rules.txt)")
+    p.add_argument("--ttl", type=float, help="cache TTL in hours (default: $SCAN_TTL_HOURS or 24)")
+    p.add_argument("--refresh", action="store_true", help="fetch every device, ignore the cache")
+    p.add_argument("--cached-only", action="store_true", help="never connect, cache only")
+    p.add_argument("--json", help="also write the offending lines per device to this file")
+    p.set_defaults(func=cmd_scan)
+
+    p = sub.add_parser("archive", help="pre-change running-config snapshots (list / show / stats)")
+    p.add_argument("--dir", help="archive directory (default: $ARCHIVE_DIR or config_archive)")
+    p.add_argument("extra", nargs=argparse.REMAINDER, help="passed to config_archive.py")
+    p.set_defaults(func=cmd_archive)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
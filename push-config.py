@@ -1,8 +1,19 @@
 #!/usr/bin/env python
 
-from pyats.topology import loader
+from concurrent.futures import ThreadPoolExecutor
+import os
 import time
 
+from testbed_cache import load_testbed
+from pyats_connect import MAX_CONNECTS, CONNECT_TIMED_OUT, connect_devices, disconnect_devices, print_connect_stats
+from run_deadline import exit_if_abandoned
+from save_ledger import SaveLedger
+
+# SAVE_MODE=defer: no write memory, pending devices are saved later by `python netops.py save`
+SAVE_MODE = os.getenv("SAVE_MODE", "now")
+TESTBED_FILE = "testbed.yaml"
+ledger = SaveLedger()
+
 config_commands = """\
 no ip access-list standard SNMP-ONLY
 ip access-list standard SNMP-ONLY
@@ -12,20 +23,41 @@ ip access-list standard SNMP-ONLY
 exit
 """
 
+def push(device):
+    try:
+        device.configure(config_commands, error_pattern = [])
+        if SAVE_MODE == "defer":
+            ledger.add(TESTBED_FILE, device.name)
+        else:
+            device.execute('write memory')
+        return device.name, "OK"
+    except Exception as e:
+        print(f"[ERROR] {device.name}: {e}")
+        return device.name, "NOT OK"
+
 #print(config_commands)
-testbed = loader.load("testbed.yaml")
+testbed = load_testbed(TESTBED_FILE)
 
 start_time = time.time()
 
-testbed.connect(learn_hostname = True, init_exec_commands = [], init_config_commands = [])
+# Unreachable switches are skipped instead of failing the whole testbed
+connected, failed, stats = connect_devices(testbed.devices.values())
+print_connect_stats(stats)
 
-testbed.configure(config_commands, error_pattern = [])
-testbed.execute('write memory')
+with ThreadPoolExecutor(max_workers = MAX_CONNECTS) as pool:
+    results = list(pool.map(push, connected))
 
 #testbed.execute('send log "Logging to splunk configured"')
 #testbed.execute('clear lldp table')
 
-testbed.disconnect()
+disconnect_devices(connected)
+
+for name, status in results:
+    print(f"{name}: {status}")
+for name, status in failed.items():
+    print(f"{name}: {status}")
 
 print("Runtime of the program is %s seconds." %(time.time()-start_time))
 
+# Hung connects still hold a thread; do not wait for them at exit
+exit_if_abandoned([name for name, status in failed.items() if status == CONNECT_TIMED_OUT])
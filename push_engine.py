@@ -0,0 +1,607 @@
+#!/usr/bin/env python3
+"""
+Config push engine
+
+run_on_device() is the connect / configure / write memory sequence of
+config_parallel__access-0x.py. push() fans it out over push targets,
+(testbed file, device) pairs built by merge_testbeds() from every
+selected testbed, deduplicated across testbeds:
+
+- "threads" (default): one global bounded thread pool, at most
+  MAX_IN_FLIGHT devices at a time, all in the agent process
+- "pcall": the original pyATS pcall, one forked process per device
+  (batched while the circuit breaker is on, see below)
+
+Results are dicts {"testbed", "device", "status"} in target order;
+print_report() groups them per testbed.
+
+With PRECHECK=1 the running config is read first (same session); a
+device that already has every line (see config_check.py) is left alone,
+without configure or write memory, and reported as "ALREADY OK".
+
+With VERIFY=1 the running config is read again after the push, in the
+same session, and checked with the same rules; a device where a line
+did not land is reported as "VERIFY FAILED". The check is literal:
+lines IOS rewrites when storing them (abbreviated commands, `username
+... secret`, short interface names) come back as VERIFY FAILED on a
+correctly configured device, so write CONFIG_COMMANDS the way `show
+running-config` prints them. For the same reason VERIFY FAILED is
+reported as a failure but does not count for the circuit breaker or
+the wave gate.
+
+With SNAPSHOT=1 the running config read in the same session is stored
+in the pre-change archive (config_archive.py) before configuring; a
+snapshot that cannot be taken fails the device.
+
+The block is applied line by line or, with BULK_MODE, copied over SCP
+and applied in one go (see bulk_config.py).
+
+With SAVE_MODE=defer the running config is not saved: every device
+configured (OK or VERIFY FAILED) is added to the pending-save ledger (save_ledger.py) as soon
+as it finishes, and one `python netops.py save` after the last push of
+a campaign writes memory on all of them.
+
+push_waves() rolls out in waves instead of all at once: ROLLOUT_WAVES
+lists the wave sizes (device count or % of the targets, "rest" for the
+remainder), each with an optional ":<max in flight>". A wave starts
+only if the previous one failed on at most WAVE_MAX_ERROR_PCT % of its
+devices; otherwise the remaining devices are reported as
+"NOT RUN (wave gate)". Example: canary of 1, then 1 %, 10 %, the rest:
+
+  ROLLOUT_WAVES="1:1,1%:5,10%:50,rest:200"
+
+With SITE_MAX_IN_FLIGHT and/or SITE_LIMITS the threads engine also
+caps the devices in flight per site (testbed custom.net_location) and
+takes devices from the sites round robin, so a site behind a slow WAN
+link never gets more than its share while the global MAX_IN_FLIGHT
+stays busy with the other sites:
+
+  SITE_MAX_IN_FLIGHT=10 SITE_LIMITS="stockholm-wan:4,vlab:50"
+
+A circuit breaker watches the last BREAKER_WINDOW outcomes of a push;
+once more than BREAKER_MAX_FAIL_PCT % of a full window failed (a bad
+CONFIG_COMMANDS fails everywhere), no new device is started: the ones
+in flight finish, the rest are reported as "NOT RUN (circuit open)".
+pcall cannot stop queued devices, so while the breaker is on
+(BREAKER_MAX_FAIL_PCT > 0, the default) the pcall engine runs in
+batches of MAX_IN_FLIGHT devices with the breaker checked between
+batches; BREAKER_MAX_FAIL_PCT=0 restores one pcall over all devices.
+
+preflight_targets() drops the devices whose SSH port does not answer a
+TCP probe (reachability.py) and reports them as "UNREACHABLE".
+
+Given a PushJournal (push_journal.py), push() records every outcome as
+it happens; resume_targets() drops the devices an interrupted run
+already finished for the same config, reported as "OK (earlier run)".
+
+Environment:
+  PUSH_ENGINE=threads      threads | pcall
+  MAX_IN_FLIGHT=50
+  PRECHECK=0
+  VERIFY=0
+  SAVE_MODE=now            now | defer
+  ROLLOUT_WAVES=           empty: one wave with every device
+  SITE_MAX_IN_FLIGHT=0     0: no per-site cap (except SITE_LIMITS)
+  SITE_LIMITS=             site:cap,site:cap
+  BREAKER_MAX_FAIL_PCT=50  0: no circuit breaker
+  BREAKER_WINDOW=20
+  WAVE_MAX_ERROR_PCT=0
+"""
+
+import os
+import math
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from testbed_cache import load_testbed
+from config_check import missing_lines
+from save_ledger import SaveLedger
+from push_journal import config_hash
+from bulk_config import apply_config, print_apply_stats
+from config_archive import SNAPSHOT, ConfigArchive
+from reachability import UNREACHABLE, split_reachable
+
+# ==========================================================
+# Configuration
+# ==========================================================
+
+PUSH_ENGINE = os.getenv("PUSH_ENGINE", "threads")
+MAX_IN_FLIGHT = int(os.getenv("MAX_IN_FLIGHT", "50"))
+PRECHECK = os.getenv("PRECHECK", "0") == "1"
+SAVE_MODE = os.getenv("SAVE_MODE", "now")
+ROLLOUT_WAVES = os.getenv("ROLLOUT_WAVES", "").strip()
+WAVE_MAX_ERROR_PCT = float(os.getenv("WAVE_MAX_ERROR_PCT", "0"))
+SITE_MAX_IN_FLIGHT = int(os.getenv("SITE_MAX_IN_FLIGHT", "0"))
+SITE_LIMITS = os.getenv("SITE_LIMITS", "")
+VERIFY = os.getenv("VERIFY", "0") == "1"
+BREAKER_MAX_FAIL_PCT = float(os.getenv("BREAKER_MAX_FAIL_PCT", "50"))
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))
+
+ALREADY_OK = "ALREADY OK"
+RESUMED = "OK (earlier run)"
+WAVE_NOT_RUN = "NOT RUN (wave gate)"
+CIRCUIT_OPEN = "NOT RUN (circuit open)"
+VERIFY_FAILED = "VERIFY FAILED"
+NOTHING_TO_PUSH = "NOTHING TO PUSH"     # template rendered to an empty block
+NOT_RUN_STATUSES = (WAVE_NOT_RUN, CIRCUIT_OPEN)
+SUCCESS_STATUSES = ("OK", ALREADY_OK, RESUMED, NOTHING_TO_PUSH)
+CONFIGURED_STATUSES = ("OK", VERIFY_FAILED)     # configure went through, running config changed
+
+archive = ConfigArchive()
+
+# ==========================================================
+# Targets
+# ==========================================================
+
+def management_ip(device):
+    try:
+        return str(device.connections["cli"]["ip"])
+    except (KeyError, TypeError, AttributeError):
+        return None
+
+
+def merge_testbeds(testbed_files):
+    """
+    Load all testbeds into one target list [(testbed file, device), ...].
+
+    A device already selected through an earlier testbed, by name or by
+    management IP, is pushed once only; the skipped copies are returned
+    as [(testbed file, device name, kept in testbed file), ...].
+    """
+    targets = []
+    duplicates = []
+    seen_names = {}
+    seen_ips = {}
+
+    for tb_file in testbed_files:
+        testbed = load_testbed(tb_file)
+
+        for device in testbed.devices.values():
+            ip = management_ip(device)
+            first = seen_names.get(device.name) or (seen_ips.get(ip) if ip else None)
+
+            if first is not None:
+                duplicates.append((tb_file, device.name, first))
+                continue
+
+            seen_names[device.name] = tb_file
+            if ip:
+                seen_ips[ip] = tb_file
+            targets.append((tb_file, device))
+
+    return targets, duplicates
+
+# ==========================================================
+# Per-device worker
+# ==========================================================
+
+def run_on_device(device, config):
+    try:
+        device.connect(
+            learn_hostname=True,
+            init_exec_commands=[],
+            init_config_commands=[]
+        )
+
+        # One `show running-config` serves both the precheck and the snapshot
+        running = device.execute("show running-config") if PRECHECK or SNAPSHOT else None
+
+        if PRECHECK:
+            missing = missing_lines(running, config)
+            if not missing:
+                print(f"[ALREADY OK] {device.name}")
+                return (device.name, ALREADY_OK)
+            print(f"[PRECHECK] {device.name}: {len(missing)} line(s) missing")
+
+        if SNAPSHOT:
+            archive.put(device.name, running)
+
+        mode = apply_config(device, config)
+        if SAVE_MODE != "defer":
+            device.execute("write memory")
+
+        if VERIFY:
+            missing = missing_lines(device.execute("show running-config"), config)
+            if missing:
+                print(f"[{VERIFY_FAILED}] {device.name}: {len(missing)} line(s) missing: {'; '.join(missing[:5])}")
+                return (device.name, VERIFY_FAILED)
+
+        print(f"[OK] {device.name} ({mode}{', verified' if VERIFY else ''})")
+        return (device.name, "OK")
+
+    except Exception as e:
+        print(f"[ERROR] {device.name}: {e}")
+        return (device.name, "NOT OK")
+
+    finally:
+        if device.connected:
+            device.disconnect()
+
+# ==========================================================
+# Engines
+# ==========================================================
+
+def config_for(config, device_name):
+    """`config` is one block for every device, or {device name: block} when rendered."""
+    return config[device_name] if isinstance(config, dict) else config
+
+
+def push_threads(devices, config, max_in_flight=MAX_IN_FLIGHT, worker=run_on_device):
+    """Bounded thread pool; results in device order."""
+    with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as pool:
+        return list(pool.map(lambda d: worker(d, config_for(config, d.name)), devices))
+
+
+def site_of(device):
+    custom = getattr(device, "custom", None) or {}
+    return custom.get("net_location") or "unknown"
+
+
+def parse_site_limits(text):
+    """"vlab:5,sto:20" -> {"vlab": 5, "sto": 20}"""
+    limits = {}
+    for item in text.split(","):
+        if item.strip():
+            site, _, limit = item.rpartition(":")
+            limits[site.strip()] = int(limit)
+    return limits
+
+
+def push_sites(devices, config, max_in_flight=MAX_IN_FLIGHT, site_max=SITE_MAX_IN_FLIGHT,
+               site_limits=None, worker=run_on_device):
+    """
+    Bounded thread pool with a cap per site as well; devices are taken
+    from the sites round robin. Results in device order.
+    """
+    site_limits = parse_site_limits(SITE_LIMITS) if site_limits is None else site_limits
+    max_in_flight = max(1, max_in_flight)
+
+    queues = {}
+    for index, device in enumerate(devices):
+        queues.setdefault(site_of(device), deque()).append((index, device))
+
+    def cap(site):
+        return site_limits.get(site) or site_max or max_in_flight
+
+    print(f"🏢 {len(queues)} site(s): " + ", ".join(
+        f"{site}={len(queue)} (cap {cap(site)})" for site, queue in queues.items()
+    ))
+
+    outcomes = [None] * len(devices)
+    in_flight = {}                  # future -> (index, site)
+    site_running = dict.fromkeys(queues, 0)
+    rotation = deque(queues)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        while rotation or in_flight:
+            # One device per site per turn, until the global or every site cap is hit
+            blocked = 0
+            while rotation and len(in_flight) < max_in_flight and blocked < len(rotation):
+                site = rotation[0]
+                rotation.rotate(-1)
+                if site_running[site] >= cap(site):
+                    blocked += 1
+                    continue
+
+                index, device = queues[site].popleft()
+                future = pool.submit(worker, device, config_for(config, device.name))
+                in_flight[future] = (index, site)
+                site_running[site] += 1
+                blocked = 0
+
+                if not queues[site]:
+                    rotation.remove(site)
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index, site = in_flight.pop(future)
+                site_running[site] -= 1
+                outcomes[index] = future.result()
+
+    return outcomes
+
+
+def push_pcall(devices, config, worker=run_on_device):
+    """
+    Legacy engine: one forked process per device given, all at once.
+    push() hands it batches of max_in_flight while the breaker is on.
+    """
+    from pyats.async_ import pcall
+
+    if isinstance(config, dict):
+        return list(pcall(worker, device=devices, config=[config[d.name] for d in devices]))
+    return list(pcall(worker, ckwargs={"config": config}, device=devices))
+
+
+class CircuitBreaker:
+    """Opens when more than max_fail_pct % of the last `window` outcomes failed."""
+
+    def __init__(self, max_fail_pct=BREAKER_MAX_FAIL_PCT, window=BREAKER_WINDOW):
+        self.max_fail_pct = max_fail_pct
+        self.recent = deque(maxlen=max(1, window))
+        self.is_open = False
+        self._lock = threading.Lock()
+
+    def record(self, status):
+        # VERIFY FAILED may be a line IOS rewrote, not a failed push
+        if not self.max_fail_pct or status in NOT_RUN_STATUSES or status == VERIFY_FAILED:
+            return
+        with self._lock:
+            self.recent.append(status not in SUCCESS_STATUSES)
+            if self.is_open or len(self.recent) < self.recent.maxlen:
+                return
+
+            fail_pct = sum(self.recent) / len(self.recent) * 100
+            if fail_pct > self.max_fail_pct:
+                self.is_open = True
+                print(
+                    f"🛑 Circuit breaker open: {fail_pct:.0f}% of the last {len(self.recent)} "
+                    f"devices failed (> {self.max_fail_pct:g}%), no new devices are started"
+                )
+
+
+def push(targets, config, engine=PUSH_ENGINE, max_in_flight=MAX_IN_FLIGHT, worker=run_on_device,
+         journal=None):
+    """
+    Push `config` to [(testbed file, device), ...] through one scheduler.
+    `config` is a block, or {device name: block} (see config_render.py).
+    """
+    targets = list(targets)
+    devices = [device for _, device in targets]
+
+    if SAVE_MODE not in ("now", "defer"):
+        raise ValueError(f"Unknown SAVE_MODE: {SAVE_MODE} (use now or defer)")
+    ledger = SaveLedger() if SAVE_MODE == "defer" else None
+    config_ids = {}     # one hash per distinct block
+    testbed_of = {device.name: tb_file for tb_file, device in targets}
+
+    breaker = CircuitBreaker()
+
+    def done(name, status):
+        breaker.record(status)
+        if journal:
+            block = config_for(config, name)
+            if block not in config_ids:
+                config_ids[block] = config_hash(block)
+            journal.record(config_ids[block], testbed_of[name], name, status)
+        # VERIFY FAILED was configured too (often a rewritten line); save it
+        if ledger and status in CONFIGURED_STATUSES:
+            ledger.add(testbed_of[name], name)
+
+    def tracked(device, config):
+        # Queued devices are not started once the breaker is open
+        if breaker.is_open:
+            return (device.name, CIRCUIT_OPEN)
+
+        # Recorded as soon as the device is done, so an aborted job still
+        # leaves every finished device in the journal and save ledger
+        name, status = worker(device, config)
+        done(name, status)
+        return (name, status)
+
+    if engine == "pcall" and breaker.max_fail_pct:
+        print(f"🧱 pcall in batches of {max(1, max_in_flight)} (circuit breaker on, BREAKER_MAX_FAIL_PCT=0: no batches)")
+        outcomes = []
+        for start in range(0, len(devices), max(1, max_in_flight)):
+            batch = devices[start:start + max(1, max_in_flight)]
+            if breaker.is_open:
+                outcomes.extend((d.name, CIRCUIT_OPEN) for d in batch)
+                continue
+            for name, status in push_pcall(batch, config, worker):
+                done(name, status)
+                outcomes.append((name, status))
+    elif engine == "pcall":
+        outcomes = push_pcall(devices, config, worker)
+        for name, status in outcomes:
+            done(name, status)
+    elif engine == "threads" and (SITE_MAX_IN_FLIGHT or SITE_LIMITS):
+        outcomes = push_sites(devices, config, max_in_flight, worker=tracked)
+    elif engine == "threads":
+        outcomes = push_threads(devices, config, max_in_flight, tracked)
+    else:
+        raise ValueError(f"Unknown PUSH_ENGINE: {engine} (use threads or pcall)")
+
+    return [
+        {"testbed": tb_file, "device": name, "status": status}
+        for (tb_file, _), (name, status) in zip(targets, outcomes)
+    ]
+
+
+def preflight_targets(targets):
+    """
+    Probe every target's SSH port first; returns (reachable targets,
+    UNREACHABLE results) so dead switches never take a worker slot.
+    """
+    targets = list(targets)
+    _, down = split_reachable(device for _, device in targets)
+    down = {device.name for device in down}
+
+    return (
+        [(tb_file, device) for tb_file, device in targets if device.name not in down],
+        [
+            {"testbed": tb_file, "device": device.name, "status": UNREACHABLE}
+            for tb_file, device in targets if device.name in down
+        ],
+    )
+
+
+def resume_targets(targets, config, journal):
+    """
+    Split targets into (still to push, results of devices the journal
+    already has as done for this config).
+    """
+    config_ids = {}     # block -> hash
+    done = {}           # hash -> devices done for it
+    todo = []
+    resumed = []
+
+    for tb_file, device in targets:
+        block = config_for(config, device.name)
+        if block not in config_ids:
+            config_ids[block] = config_hash(block)
+            done[config_ids[block]] = journal.completed(config_ids[block], SUCCESS_STATUSES)
+
+        if device.name in done[config_ids[block]]:
+            resumed.append({"testbed": tb_file, "device": device.name, "status": RESUMED})
+        else:
+            todo.append((tb_file, device))
+
+    return todo, resumed
+
+# ==========================================================
+# Wave rollout
+# ==========================================================
+
+def parse_waves(spec, total, max_in_flight=MAX_IN_FLIGHT):
+    """
+    "1:1,10%:50,rest" -> [(size, max in flight), ...] for `total` targets.
+
+    Sizes are rounded up and cut at what is left; whatever the listed
+    waves do not cover goes into a last wave.
+    """
+    waves = []
+    left = total
+
+    for item in spec.split(","):
+        item = item.strip()
+        if not item or not left:
+            continue
+
+        size_text, _, limit_text = item.partition(":")
+        size_text = size_text.strip().lower()
+
+        if size_text == "rest":
+            size = left
+        elif size_text.endswith("%"):
+            size = math.ceil(total * float(size_text[:-1]) / 100)
+        else:
+            size = int(size_text)
+
+        if size < 1:
+            raise ValueError(f"Invalid wave size in ROLLOUT_WAVES: {item}")
+
+        size = min(size, left)
+        limit = int(limit_text) if limit_text.strip() else max_in_flight
+        waves.append((size, limit))
+        left -= size
+
+    if left:
+        waves.append((left, waves[-1][1] if waves else max_in_flight))
+
+    return waves
+
+
+def push_waves(targets, config, spec=ROLLOUT_WAVES, max_error_pct=WAVE_MAX_ERROR_PCT,
+               engine=PUSH_ENGINE, max_in_flight=MAX_IN_FLIGHT, worker=run_on_device,
+               journal=None):
+    """push() wave by wave; stops at the first wave above `max_error_pct`."""
+    targets = list(targets)
+    waves = parse_waves(spec, len(targets), max_in_flight)
+    results = []
+    start = 0
+
+    for number, (size, limit) in enumerate(waves, 1):
+        wave = targets[start:start + size]
+        start += size
+
+        print(f"\n🌊 Wave {number}/{len(waves)}: {len(wave)} device(s), max in flight={limit}")
+        wave_results = push(wave, config, engine, limit, worker, journal)
+        results.extend(wave_results)
+
+        failed = sum(1 for r in wave_results if r["status"] not in SUCCESS_STATUSES + (VERIFY_FAILED,))
+        unverified = sum(1 for r in wave_results if r["status"] == VERIFY_FAILED)
+        error_pct = failed / len(wave) * 100
+        print(
+            f"🌊 Wave {number} done: {failed} failed ({error_pct:.1f}%)"
+            + (f", {unverified} {VERIFY_FAILED} (not gated)" if unverified else "")
+        )
+
+        if error_pct > max_error_pct and start < len(targets):
+            print(
+                f"🛑 Wave {number} error rate {error_pct:.1f}% > {max_error_pct:g}%: "
+                f"{len(targets) - start} device(s) not run"
+            )
+            results.extend(
+                {"testbed": tb_file, "device": device.name, "status": WAVE_NOT_RUN}
+                for tb_file, device in targets[start:]
+            )
+            break
+
+    return results
+
+# ==========================================================
+# Execution report
+# ==========================================================
+
+def print_report(results, duplicates=()):
+    from tabulate import tabulate
+
+    ok_count = 0
+    fail_count = 0
+    skip_count = 0
+    resumed_count = 0
+    empty_count = 0
+    not_run_count = 0
+
+    by_testbed = {}
+    for result in results:
+        by_testbed.setdefault(result["testbed"], []).append(result)
+
+    print("\n================ Execution Report ================")
+
+    for tb_file, tb_results in by_testbed.items():
+        table = []
+        tb_ok = 0
+        tb_not_run = 0
+
+        for result in tb_results:
+            table.append([result["device"], result["status"]])
+            if result["status"] in SUCCESS_STATUSES:
+                tb_ok += 1
+            if result["status"] == ALREADY_OK:
+                skip_count += 1
+            if result["status"] == RESUMED:
+                resumed_count += 1
+            if result["status"] == NOTHING_TO_PUSH:
+                empty_count += 1
+            if result["status"] in NOT_RUN_STATUSES:
+                tb_not_run += 1
+
+        ok_count += tb_ok
+        not_run_count += tb_not_run
+        fail_count += len(tb_results) - tb_ok - tb_not_run
+
+        print(f"\n📁 {tb_file}  (OK {tb_ok} / {len(tb_results)})\n")
+        print(tabulate(table, headers=["Device", "Status"], tablefmt="grid"))
+
+    if duplicates:
+        print("\n🔁 Skipped duplicates (already pushed via another testbed)\n")
+        print(tabulate(
+            [list(d) for d in duplicates],
+            headers=["Testbed", "Device", "Pushed via"],
+            tablefmt="grid",
+        ))
+
+    pushed = ok_count - skip_count - resumed_count - empty_count
+
+    print(f"\nSuccess: {pushed}")
+    print(f"Already OK: {skip_count}")
+    if resumed_count:
+        print(f"Resumed: {resumed_count} done by an earlier run (journal)")
+    if empty_count:
+        print(f"Nothing to push: {empty_count} (template rendered empty, not connected)")
+    print(f"Failed : {fail_count}")
+    if not_run_count:
+        print(f"Not run: {not_run_count} (stopped by the wave gate / circuit breaker)")
+
+    total = ok_count - empty_count + fail_count
+    if VERIFY:
+        print(f"Verified: {pushed} pushed device(s) have every line")
+    if PRECHECK and total:
+        print(f"Skip rate: {skip_count}/{total} ({skip_count / total * 100:.1f}%) already compliant")
+    if SAVE_MODE == "defer":
+        unverified = sum(1 for r in results if r["status"] == VERIFY_FAILED)
+        print(f"Pending save: {pushed + unverified} added (run `python netops.py save` when the campaign is done)")
+    print_apply_stats()
+    print("==================================================")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Push journal (checkpoints for interrupted pushes)
+
+Every device outcome of a push is appended to push_journal.jsonl as
+soon as the device is done, together with a hash of the pushed config.
+A re-run with --resume (or RESUME=1) skips the devices the journal
+already has as OK / ALREADY OK for the same config, so an aborted job
+only costs the devices it had not reached.
+
+Environment:
+  PUSH_JOURNAL_FILE=push_journal.jsonl
+  RESUME=0
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+# ==============================
+# CONFIG
+# ==============================
+PUSH_JOURNAL_FILE = os.getenv("PUSH_JOURNAL_FILE", "push_journal.jsonl")
+RESUME = os.getenv("RESUME", "0") == "1"
+
+# ==============================
+# JOURNAL
+# ==============================
+def config_hash(config):
+    """Same commands -> same hash, whatever the trailing whitespace."""
+    lines = [line.rstrip() for line in config.strip().splitlines()]
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()[:16]
+
+
+class PushJournal:
+    """Append-only per-device outcomes, one JSON line each."""
+
+    def __init__(self, path=PUSH_JOURNAL_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, config_id, tb_file, device_name, status):
+        line = json.dumps({
+            "config": config_id, "testbed": tb_file,
+            "device": device_name, "status": status, "ts": time.time(),
+        })
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def outcomes(self, config_id):
+        """{device name: last status} for one config."""
+        last = {}
+        if not os.path.isfile(self.path):
+            return last
+
+        with self._lock, open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue    # torn last line of an aborted run
+                if record["config"] == config_id:
+                    last[record["device"]] = record["status"]
+
+        return last
+
+    def last_changes(self):
+        """
+        {device name: time of its last push that may have changed the
+        config}, any config (everything but ALREADY OK / NOT RUN).
+        """
+        last = {}
+        if not os.path.isfile(self.path):
+            return last
+
+        with self._lock, open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record["status"] != "ALREADY OK" and not record["status"].startswith("NOT RUN"):
+                    last[record["device"]] = max(record["ts"], last.get(record["device"], 0))
+
+        return last
+
+    def completed(self, config_id, success_statuses):
+        return {
+            name for name, status in self.outcomes(config_id).items()
+            if status in success_statuses
+        }
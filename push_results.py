@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Push result files and merge of sharded pushes
+
+A large campaign can be split over several Jenkins agents with
+`config_parallel__access-05.py --shard i/N`: every device of the
+selected TESTBEDS belongs to exactly one shard (hash of its name), so
+N agents push disjoint parts of the fleet. Each shard writes its
+results to push_results_shard<i>of<N>.json; the merge step combines
+them into one execution report:
+
+  python netops.py merge push_results_shard*.json
+
+The wave gate and circuit breaker work per shard.
+"""
+
+import sys
+import json
+import time
+import hashlib
+
+# ==============================
+# SHARDING
+# ==============================
+def parse_shard(text):
+    """"2/4" -> (2, 4); shards are numbered from 1."""
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard: {text} (use i/N, e.g. 2/4)")
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard: {text} (1 <= i <= N)")
+    return index, count
+
+
+def shard_of(device_name, count):
+    """1..count; stable across agents, runs and Python versions."""
+    digest = hashlib.sha256(device_name.encode()).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def shard_targets(targets, index, count):
+    return [(tb_file, device) for tb_file, device in targets if shard_of(device.name, count) == index]
+
+
+def results_file(index, count):
+    return f"push_results_shard{index}of{count}.json"
+
+# ==============================
+# RESULT FILES
+# ==============================
+def write_results(path, results, duplicates=(), shard=None, config_id=None, runtime=None):
+    with open(path, "w") as f:
+        json.dump({
+            "shard": shard,
+            "config": config_id,
+            "finished": time.time(),
+            "runtime": runtime,
+            "results": results,
+            "duplicates": [list(d) for d in duplicates],
+        }, f, indent=1)
+    print(f"✅ Results saved to {path}")
+
+
+def merge_results(paths):
+    """(results, duplicates, problems) of several result files."""
+    results = []
+    duplicates = []
+    problems = []
+    shards = {}
+    configs = set()
+
+    for path in paths:
+        with open(path) as f:
+            data = json.load(f)
+
+        results.extend(data["results"])
+        for duplicate in data["duplicates"]:
+            if duplicate not in duplicates:
+                duplicates.append(duplicate)
+        configs.add(data["config"])
+
+        if data["shard"]:
+            index, count = parse_shard(data["shard"])
+            shards.setdefault(count, set()).add(index)
+
+    if len(configs) > 1:
+        problems.append(f"result files are for {len(configs)} different configs")
+    for count, seen in shards.items():
+        missing = sorted(set(range(1, count + 1)) - seen)
+        if missing:
+            problems.append(f"shard(s) {', '.join(f'{i}/{count}' for i in missing)} missing")
+    if len(shards) > 1:
+        problems.append("result files come from different shard counts")
+
+    names = [r["device"] for r in results]
+    if len(names) != len(set(names)):
+        problems.append("some devices appear in more than one result file")
+
+    return results, [tuple(d) for d in duplicates], problems
+
+# ==============================
+# MAIN
+# ==============================
+def main(paths):
+    from push_engine import NOT_RUN_STATUSES, print_report
+
+    if not paths:
+        print("❌ No result files given")
+        sys.exit(1)
+
+    results, duplicates, problems = merge_results(paths)
+
+    print(f"\n🧮 Merged {len(paths)} result file(s): {len(results)} devices")
+    for problem in problems:
+        print(f"⚠️ {problem}")
+
+    print_report(results, duplicates)
+
+    if problems or any(r["status"] in NOT_RUN_STATUSES for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Bounded, timeout-aware parallel connect for pyATS testbeds
+
+testbed.connect() treats the whole testbed as one unit: one unreachable
+switch stalls or fails the step and there is no control over fan-out.
+connect_devices() connects devices individually on a bounded pool:
+
+- at most MAX_CONNECTS connects in flight
+- each device gets CONNECT_TIMEOUT seconds (unicon connection_timeout,
+  plus a hard watchdog in case the connect hangs anyway)
+- failures are skipped, the caller gets back the devices that connected
+- with PREFLIGHT=1 (default) devices whose SSH port does not answer a
+  TCP probe (reachability.py) are "UNREACHABLE" and never attempted
+- per-device connect times are collected for print_connect_stats()
+
+A connect abandoned by the watchdog ("CONNECT TIMEOUT") keeps its pool
+thread until unicon gives up, and the interpreter waits for it at exit;
+callers finish with run_deadline.exit_if_abandoned() on those devices.
+
+Environment:
+  MAX_CONNECTS=20
+  CONNECT_TIMEOUT=30
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from reachability import PREFLIGHT, UNREACHABLE, split_reachable
+
+# ==============================
+# CONFIG
+# ==============================
+MAX_CONNECTS = int(os.getenv("MAX_CONNECTS", "20"))
+CONNECT_TIMEOUT = float(os.getenv("CONNECT_TIMEOUT", "30"))
+CONNECT_GRACE = 10           # extra seconds before the watchdog abandons a connect
+WATCHDOG_TICK = 0.5
+
+CONNECT_FAILED = "CONNECT FAILED"
+CONNECT_TIMED_OUT = "CONNECT TIMEOUT"
+
+DEFAULT_CONNECT_ARGS = {
+    "learn_hostname": True,
+    "init_exec_commands": [],
+    "init_config_commands": [],
+}
+
+# ==============================
+# CONNECT
+# ==============================
+def connect_device(device, timeout, started, **connect_kwargs):
+    """Connect one device, return the seconds it took. Raises on failure."""
+    started[device.name] = time.time()
+    device.connect(connection_timeout=timeout, **connect_kwargs)
+    return time.time() - started[device.name]
+
+
+def connect_devices(devices, max_connects=MAX_CONNECTS, timeout=CONNECT_TIMEOUT,
+                    deadline=None, **connect_kwargs):
+    """
+    Connect `devices` with skip-and-continue semantics.
+
+    Returns (connected, failed, stats):
+      connected: devices that are connected, in input order
+      failed:    {device name: status} for the others
+      stats:     connect-time statistics, see print_connect_stats()
+
+    A RunDeadline may be passed: devices not started before it expires
+    are not attempted.
+    """
+    devices = list(devices)
+    kwargs = dict(DEFAULT_CONNECT_ARGS, **connect_kwargs)
+
+    started = {}
+    durations = {}
+    failed = {}
+    abandoned = set()
+
+    wall_start = time.time()
+
+    candidates = devices
+    if PREFLIGHT:
+        candidates, down = split_reachable(devices)
+        failed.update((d.name, UNREACHABLE) for d in down)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_connects))
+    pending = {
+        pool.submit(connect_device, d, timeout, started, **kwargs): d
+        for d in candidates
+    }
+
+    def late_disconnect(device):
+        """An abandoned connect that eventually succeeds is closed again."""
+        def callback(f):
+            if f.cancelled() or device.name not in abandoned:
+                return
+            if not f.exception() and device.connected:
+                try:
+                    device.disconnect()
+                except Exception:
+                    pass
+        return callback
+
+    while pending:
+        done, _ = wait(pending, timeout=WATCHDOG_TICK, return_when=FIRST_COMPLETED)
+
+        for f in done:
+            device = pending.pop(f)
+            try:
+                durations[device.name] = f.result()
+                print(f"🔌 Connected {device.name} ({durations[device.name]:.1f}s)")
+            except Exception as e:
+                failed[device.name] = CONNECT_FAILED
+                print(f"❌ Connect failed on {device.name}: {e}")
+
+        now = time.time()
+        for f, device in list(pending.items()):
+            device_started = started.get(device.name)
+            if device_started is None:
+                if deadline is None or not deadline.expired():
+                    continue
+            elif now - device_started <= timeout + CONNECT_GRACE:
+                continue
+
+            # Hung connect, or not started before the run deadline: skip it
+            f.cancel()
+            abandoned.add(device.name)
+            f.add_done_callback(late_disconnect(device))
+            del pending[f]
+            failed[device.name] = CONNECT_TIMED_OUT
+            print(f"⏰ Connect to {device.name} timed out, skipping")
+
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    connected = [d for d in devices if d.name in durations]
+    stats = connect_stats(durations, len(devices), time.time() - wall_start)
+    return connected, failed, stats
+
+
+def disconnect_devices(devices, max_workers=MAX_CONNECTS):
+    """Disconnect in parallel, ignoring errors."""
+    def disconnect(device):
+        try:
+            if device.connected:
+                device.disconnect()
+        except Exception as e:
+            print(f"⚠️ Disconnect failed on {device.name}: {e}")
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        list(pool.map(disconnect, devices))
+
+# ==============================
+# STATISTICS
+# ==============================
+def connect_stats(durations, attempted, wall):
+    times = sorted(durations.values())
+
+    def percentile(p):
+        if not times:
+            return 0.0
+        return times[min(len(times) - 1, int(round(p * (len(times) - 1))))]
+
+    return {
+        "attempted": attempted,
+        "connected": len(times),
+        "failed": attempted - len(times),
+        "min": times[0] if times else 0.0,
+        "avg": sum(times) / len(times) if times else 0.0,
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "max": times[-1] if times else 0.0,
+        "wall": wall,
+    }
+
+
+def print_connect_stats(stats):
+    print("\n🔌 Connect stage")
+    print(
+        f"   connected {stats['connected']}/{stats['attempted']} "
+        f"(failed {stats['failed']}) in {stats['wall']:.1f}s wall"
+    )
+    print(
+        f"   per device: min {stats['min']:.1f}s  avg {stats['avg']:.1f}s  "
+        f"p50 {stats['p50']:.1f}s  p95 {stats['p95']:.1f}s  max {stats['max']:.1f}s\n"
+    )
@@ -1,9 +1,18 @@
 #!/usr/bin/env python3
 
+import os
 import time
-from pyats.topology import loader
-import pandas as pd
-from tabulate import tabulate
+
+from testbed_cache import load_testbed
+from run_deadline import RunDeadline, SessionRegistry, TIMED_OUT, exit_if_abandoned, run_watched
+from pyats_connect import (
+    MAX_CONNECTS,
+    CONNECT_TIMEOUT,
+    CONNECT_TIMED_OUT,
+    connect_devices,
+    disconnect_devices,
+    print_connect_stats,
+)
 
 # ==============================
 # CONFIG
@@ -11,6 +20,16 @@ from tabulate import tabulate
 TESTBED_FILE = "testbed.yaml"
 OUTPUT_EXCEL = "pyats_device_ports_status.xlsx"
 
+# Run deadline / per-device budget: RUN_DEADLINE, DEVICE_BUDGET env (run_deadline.py)
+# Connect fan-out / timeout: MAX_CONNECTS, CONNECT_TIMEOUT env (pyats_connect.py)
+EXEC_TIMEOUT = 60
+
+# Post-connect collection runs on a bounded thread pool
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", "10"))
+
+# Sessions of devices being collected; the watchdog closes a straggler's
+SESSIONS = SessionRegistry()
+
 MEDIA_COLUMNS = [
     "10/100BaseTX",
     "10/100/1000BaseTX",
@@ -72,64 +91,140 @@ def pct(active, total):
     return round((active / total) * 100, 2) if total else 0
 
 
+# ==============================
+# PER-DEVICE COLLECTION
+# ==============================
+def empty_row(device):
+    row = {
+        "Hostname": device.name,
+        "Total Ports": 0,
+        "Active Ports": 0,
+        "Port Utilization %": 0,
+        "Status": "FAILED",
+    }
+    for m in MEDIA_COLUMNS:
+        row[m] = 0
+    return row
+
+
+def collect_device(device, deadline):
+    """
+    Collect one connected device. Never raises: failures stay isolated
+    in the device's own row.
+    """
+    row = empty_row(device)
+
+    if deadline.expired():
+        print(f"⏰ Run deadline reached, skipping {device.name}")
+        row["Status"] = TIMED_OUT
+        return row
+
+    device_started = time.time()
+    SESSIONS.register(device.name, device.disconnect)
+
+    try:
+        print(f"📊 Processing {device.name} ...")
+
+        output = device.execute(
+            "show interfaces status",
+            timeout=deadline.clip(EXEC_TIMEOUT),
+        )
+
+        total, active, media = parse_interfaces(output)
+
+        row["Total Ports"] = total
+        row["Active Ports"] = active
+        row["Port Utilization %"] = pct(active, total)
+
+        for m in MEDIA_COLUMNS:
+            row[m] = media[m]
+
+        row["Status"] = "OK"
+
+    except Exception as e:
+        if deadline.device_expired(device_started):
+            row["Status"] = TIMED_OUT
+        print(f"❌ Failed on {device.name}: {e}")
+
+    finally:
+        SESSIONS.unregister(device.name)
+
+    return row
+
+
+def collect_all(devices, deadline):
+    """
+    Run collect_device() for all devices on MAX_WORKERS threads.
+    Rows come back in testbed order, whatever order devices finish in.
+    A device over its budget (DEVICE_BUDGET), or still running at the
+    run deadline, is abandoned (session closed) and reported as TIMED OUT.
+    """
+    collected = run_watched(
+        lambda d: collect_device(d, deadline),
+        devices,
+        key=lambda d: d.name,
+        max_workers=MAX_WORKERS,
+        deadline=deadline,
+        sessions=SESSIONS,
+    )
+
+    rows = []
+    for device in devices:
+        row = collected.get(device.name)
+        if row is None:
+            row = empty_row(device)
+            row["Status"] = TIMED_OUT
+        rows.append(row)
+    return rows
+
+
 # ==============================
 # MAIN
 # ==============================
 def main():
+    deadline = RunDeadline()
+
     print("\n📦 Loading testbed...")
-    testbed = loader.load(TESTBED_FILE)
+    testbed = load_testbed(TESTBED_FILE)
 
     devices = [
         d for d in testbed.devices.values()
         if d.os in ("ios", "iosxe")
     ]
 
-    print(f"\n🔌 Connecting to {len(devices)} devices (testbed-level connect)\n")
+    print(f"\n🔌 Connecting to {len(devices)} devices (max connects={MAX_CONNECTS}, workers={MAX_WORKERS})\n")
 
     start = time.time()
 
-    # 🔑 THIS IS THE KEY (same as your working script)
-    testbed.connect(
-        learn_hostname=True,
-        init_exec_commands=[],
-        init_config_commands=[]
+    connected, failed, stats = connect_devices(
+        devices,
+        timeout=deadline.clip(CONNECT_TIMEOUT),
+        deadline=deadline,
     )
+    print_connect_stats(stats)
 
-    rows = []
+    collected = dict(zip(
+        [d.name for d in connected],
+        collect_all(connected, deadline),
+    ))
 
+    rows = []
     for device in devices:
-        row = {
-            "Hostname": device.name,
-            "Total Ports": 0,
-            "Active Ports": 0,
-            "Port Utilization %": 0,
-        }
-        for m in MEDIA_COLUMNS:
-            row[m] = 0
-
-        try:
-            print(f"📊 Processing {device.name} ...")
-
-            output = device.execute("show interfaces status")
-
-            total, active, media = parse_interfaces(output)
-
-            row["Total Ports"] = total
-            row["Active Ports"] = active
-            row["Port Utilization %"] = pct(active, total)
-
-            for m in MEDIA_COLUMNS:
-                row[m] = media[m]
-
-        except Exception as e:
-            print(f"❌ Failed on {device.name}: {e}")
-
+        row = collected.get(device.name)
+        if row is None:
+            row = empty_row(device)
+            row["Status"] = failed.get(device.name, "FAILED")
         rows.append(row)
 
-    testbed.disconnect()
+    # Abandoned sessions were closed by the watchdog already
+    disconnect_devices([d for d in connected if collected[d.name]["Status"] != TIMED_OUT])
 
     elapsed = round(time.time() - start, 2)
 
+    # Only the report needs pandas / tabulate
+    import pandas as pd
+    from tabulate import tabulate
+
     df = pd.DataFrame(rows)
 
     print("\n📊 pyATS Port Utilization Summary\n")
@@ -140,6 +235,9 @@ def main():
     print(f"\n✅ Results saved to {OUTPUT_EXCEL}")
     print(f"⏱ Execution time: {elapsed} seconds")
 
+    # Report is on disk; do not wait for abandoned connects / collections to unwind
+    exit_if_abandoned([r["Hostname"] for r in rows if r["Status"] in (TIMED_OUT, CONNECT_TIMED_OUT)])
+
 
 if __name__ == "__main__":
     main()
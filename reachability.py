@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+TCP preflight before connecting
+
+A dead switch costs a full unicon / netmiko connect timeout and holds a
+worker slot meanwhile. probe_all() opens a plain TCP connection to the
+SSH port of every target at once (asyncio, short timeout) before any
+real session; targets that do not answer are reported as "UNREACHABLE"
+and never reach the connect pool.
+
+Used by push_engine (config_parallel__access-05.py), pyats_connect
+(pyATS collectors, push-config.py) and ssh_ports_parallel.py.
+
+Environment:
+  PREFLIGHT=1
+  PREFLIGHT_TIMEOUT=2
+  PREFLIGHT_CONCURRENCY=500
+"""
+
+import os
+import time
+import asyncio
+
+# ==============================
+# CONFIG
+# ==============================
+PREFLIGHT = os.getenv("PREFLIGHT", "1") == "1"
+PREFLIGHT_TIMEOUT = float(os.getenv("PREFLIGHT_TIMEOUT", "2"))
+PREFLIGHT_CONCURRENCY = int(os.getenv("PREFLIGHT_CONCURRENCY", "500"))
+
+SSH_PORT = 22
+UNREACHABLE = "UNREACHABLE"
+
+# ==============================
+# PROBE
+# ==============================
+async def probe(host, port, timeout, limit):
+    async with limit:
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        except (OSError, asyncio.TimeoutError):
+            return False
+
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+
+async def probe_many(addresses, timeout, concurrency):
+    limit = asyncio.Semaphore(max(1, concurrency))
+    keys = list(addresses)
+    answers = await asyncio.gather(*(
+        probe(*addresses[key], timeout, limit) for key in keys
+    ))
+    return dict(zip(keys, answers))
+
+
+def probe_all(addresses, timeout=PREFLIGHT_TIMEOUT, concurrency=PREFLIGHT_CONCURRENCY):
+    """
+    {key: (host, port)} -> {key: reachable}. Keys without an address
+    (host None) are left to the real connect and count as reachable.
+    """
+    known = {key: addr for key, addr in addresses.items() if addr[0]}
+    reachable = dict.fromkeys(addresses, True)
+
+    if known:
+        started = time.time()
+        reachable.update(asyncio.run(probe_many(known, timeout, concurrency)))
+        down = sum(1 for key in known if not reachable[key])
+        print(
+            f"📡 Preflight TCP: {len(known) - down}/{len(known)} reachable "
+            f"in {time.time() - started:.1f}s (timeout {timeout:g}s)"
+        )
+
+    return reachable
+
+
+def device_address(device):
+    """(ip, port) of a pyATS device's CLI connection, (None, None) if unknown."""
+    try:
+        cli = device.connections["cli"]
+        return (str(cli["ip"]), int(cli.get("port") or SSH_PORT))
+    except (KeyError, TypeError, AttributeError):
+        return (None, None)
+
+
+def split_reachable(devices, timeout=PREFLIGHT_TIMEOUT, concurrency=PREFLIGHT_CONCURRENCY):
+    """pyATS devices -> (reachable devices, unreachable devices), input order kept."""
+    devices = list(devices)
+    reachable = probe_all(
+        {device.name: device_address(device) for device in devices},
+        timeout, concurrency,
+    )
+
+    up = [d for d in devices if reachable[d.name]]
+    down = [d for d in devices if not reachable[d.name]]
+    for device in down:
+        print(f"📵 {device.name}: {UNREACHABLE}")
+    return up, down
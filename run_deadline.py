@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Run-level deadline and per-device time budgets
+
+Shared by the collectors so a single hung device cannot keep a Jenkins
+job running past its slot:
+
+- RunDeadline: wall-clock deadline for the whole run plus a time budget
+  for each device, clipped to what is left of the run.
+- SessionRegistry: open sessions by device name, so a watchdog can close
+  the socket under a straggling worker and free its thread.
+- run_watched(): a bounded thread pool with that watchdog, for workers
+  that call into libraries without their own timeout (Genie learn).
+- exit_if_abandoned(): an abandoned worker thread may still be stuck,
+  and the interpreter joins every pool thread at exit; once the report
+  is written, a run with abandoned devices leaves with os._exit().
+
+Environment:
+  RUN_DEADLINE=0       seconds for the whole run (0 = no deadline)
+  DEVICE_BUDGET=120    seconds per device (0 = no budget)
+"""
+
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# ===============================
+# CONFIGURATION
+# ===============================
+RUN_DEADLINE = float(os.getenv("RUN_DEADLINE", "0"))
+DEVICE_BUDGET = float(os.getenv("DEVICE_BUDGET", "120"))
+
+TIMED_OUT = "TIMED OUT"
+WATCHDOG_TICK = 0.5          # seconds between straggler checks
+
+# ===============================
+# DEADLINE
+# ===============================
+class RunDeadline:
+    """
+    Uses wall-clock time (not monotonic) so the same deadline can be
+    handed to worker processes.
+    """
+
+    def __init__(self, run_seconds=RUN_DEADLINE, device_seconds=DEVICE_BUDGET):
+        self.started = time.time()
+        self.run_seconds = run_seconds
+        self.device_seconds = device_seconds
+
+    def remaining(self):
+        if not self.run_seconds:
+            return float("inf")
+        return max(0.0, self.started + self.run_seconds - time.time())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def device_budget(self):
+        """Seconds a device starting now may use."""
+        budget = self.device_seconds or float("inf")
+        return min(budget, self.remaining())
+
+    def device_expired(self, device_started):
+        """True once a device that started at `device_started` is over budget."""
+        if self.expired():
+            return True
+        if not self.device_seconds:
+            return False
+        return time.time() - device_started > self.device_seconds
+
+    def clip(self, seconds):
+        """A timeout of at most `seconds`, never past the device budget (min 1s)."""
+        return max(1.0, min(seconds, self.device_budget()))
+
+# ===============================
+# SESSIONS
+# ===============================
+class SessionRegistry:
+    """
+    Thread-safe map of device name -> callable that closes its session.
+    Workers register right after connecting and unregister when done.
+    """
+
+    def __init__(self):
+        self._closers = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, closer):
+        with self._lock:
+            self._closers[name] = closer
+
+    def unregister(self, name):
+        with self._lock:
+            self._closers.pop(name, None)
+
+    def abort(self, name):
+        """Close the session of a straggler. Its worker then fails fast."""
+        with self._lock:
+            closer = self._closers.pop(name, None)
+        if closer is None:
+            return False
+        try:
+            closer()
+        except Exception as e:
+            print(f"⚠️ Could not close session of {name}: {e}")
+        return True
+
+    def active(self):
+        with self._lock:
+            return sorted(self._closers)
+
+# ===============================
+# WATCHED POOL
+# ===============================
+def run_watched(worker, items, key, max_workers, deadline, sessions):
+    """
+    {key(item): worker(item)} on `max_workers` threads. An item still
+    running past its device budget, or not finished at the run deadline,
+    is abandoned: its session is closed (in the background, a hung
+    close must not stall the watchdog) and it gets no entry.
+    """
+    started = {}
+
+    def run(item):
+        started[key(item)] = time.time()
+        return worker(item)
+
+    results = {}
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    pending = {pool.submit(run, item): key(item) for item in items}
+
+    while pending:
+        done, _ = wait(pending, timeout=WATCHDOG_TICK, return_when=FIRST_COMPLETED)
+
+        for f in done:
+            results[pending.pop(f)] = f.result()
+
+        for f, name in list(pending.items()):
+            device_started = started.get(name)
+            if device_started is None:
+                if not deadline.expired():
+                    continue
+            elif not deadline.device_expired(device_started):
+                continue
+
+            f.cancel()
+            del pending[f]
+            threading.Thread(target=sessions.abort, args=(name,), daemon=True).start()
+            print(f"⏰ {name} over its time budget, abandoned")
+
+    pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def exit_if_abandoned(names):
+    """Call last, after the report is written: exits now if any device was abandoned."""
+    if not names:
+        return
+    print(f"⏰ {len(names)} device(s) timed out: {', '.join(names)}")
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(0)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Pending-save ledger and batched `write memory` pass
+
+A push with SAVE_MODE=defer leaves the running config unsaved and adds
+the device to this ledger instead of paying for `write memory` on every
+push. After one or several pushes, the save pass connects to every
+pending device on a wide thread pool and saves them all in one sweep:
+
+  python netops.py save
+  python save_ledger.py
+
+The ledger is an append-only JSON-lines file, so entries written by a
+push survive an aborted job; the save pass compacts it. A save only
+clears the entries it covered: a push that lands on a device during the
+sweep stays pending for the next save pass. Appends and compaction are
+serialized across processes with a lock file next to the ledger.
+
+Environment:
+  SAVE_LEDGER_FILE=pending_saves.jsonl
+  SAVE_MAX_IN_FLIGHT=200
+"""
+
+import os
+import json
+import time
+import fcntl
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+# ==========================================================
+# Configuration
+# ==========================================================
+
+SAVE_LEDGER_FILE = os.getenv("SAVE_LEDGER_FILE", "pending_saves.jsonl")
+SAVE_MAX_IN_FLIGHT = int(os.getenv("SAVE_MAX_IN_FLIGHT", "200"))
+
+# ==========================================================
+# Ledger
+# ==========================================================
+
+class SaveLedger:
+    """Devices whose running config is not yet written to startup."""
+
+    def __init__(self, path=SAVE_LEDGER_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _file_lock(self, exclusive=False):
+        """
+        Shared for appends, exclusive for compact(), across threads and
+        processes (several push jobs and the save pass on one agent).
+        """
+        with self._lock, open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _append(self, records):
+        with self._file_lock(), open(self.path, "a") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def add(self, tb_file, device_name):
+        self._append([{"op": "pending", "testbed": tb_file, "device": device_name, "ts": time.time()}])
+
+    def mark_saved(self, covered):
+        """
+        covered: {device name: ts of the last pending entry the save
+        included}. Later entries (a push that landed after the device
+        was read from the ledger) stay pending.
+        """
+        now = time.time()
+        self._append([{"op": "saved", "device": name, "upto": upto, "ts": now} for name, upto in covered.items()])
+
+    def _read(self):
+        """{device name: {"testbed", "times": [pending ts, ...]}} of unsaved devices."""
+        state = {}
+        if not os.path.isfile(self.path):
+            return state
+
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue    # torn last line of an aborted run
+
+                name = record["device"]
+                if record["op"] == "saved":
+                    entry = state.get(name)
+                    if entry is None:
+                        continue
+                    entry["times"] = [ts for ts in entry["times"] if ts > record.get("upto", record["ts"])]
+                    if not entry["times"]:
+                        del state[name]
+                else:
+                    entry = state.setdefault(name, {"testbed": record["testbed"], "times": []})
+                    entry["testbed"] = record["testbed"]
+                    entry["times"].append(record["ts"])
+
+        return state
+
+    def pending(self):
+        """{device name: {"testbed", "since", "last", "pushes"}} of unsaved devices."""
+        with self._file_lock():
+            state = self._read()
+        return {
+            name: {"testbed": entry["testbed"], "since": min(entry["times"]),
+                   "last": max(entry["times"]), "pushes": len(entry["times"])}
+            for name, entry in state.items()
+        }
+
+    def compact(self):
+        """Rewrite the file with only the still pending entries."""
+        tmp = f"{self.path}.tmp"
+        with self._file_lock(exclusive=True):
+            state = self._read()
+            with open(tmp, "w") as f:
+                for name, entry in state.items():
+                    for ts in entry["times"]:
+                        f.write(json.dumps({
+                            "op": "pending", "testbed": entry["testbed"], "device": name, "ts": ts,
+                        }) + "\n")
+            os.replace(tmp, self.path)
+
+# ==========================================================
+# Save pass
+# ==========================================================
+
+def save_device(device):
+    try:
+        device.connect(
+            learn_hostname=True,
+            init_exec_commands=[],
+            init_config_commands=[]
+        )
+        device.execute("write memory")
+        print(f"[SAVED] {device.name}")
+        return (device.name, "SAVED")
+
+    except Exception as e:
+        print(f"[ERROR] {device.name}: {e}")
+        return (device.name, "NOT SAVED")
+
+    finally:
+        if device.connected:
+            device.disconnect()
+
+
+def flush_pending(ledger=None, max_in_flight=SAVE_MAX_IN_FLIGHT):
+    """Save every pending device; returns [(testbed, device, status), ...]."""
+    from testbed_cache import load_testbed
+
+    ledger = ledger or SaveLedger()
+    pending = ledger.pending()
+    if not pending:
+        print("✅ No devices with unsaved configuration")
+        return []
+
+    devices = []
+    results = []
+    testbeds = {}
+
+    for name, entry in pending.items():
+        tb_file = entry["testbed"]
+        if tb_file not in testbeds:
+            testbeds[tb_file] = load_testbed(tb_file)
+        device = testbeds[tb_file].devices.get(name)
+        if device is None:
+            results.append((tb_file, name, "NOT IN TESTBED"))
+            continue
+        devices.append((tb_file, device))
+
+    print(f"\n💾 Saving {len(devices)} device(s) (max in flight={max_in_flight})\n")
+
+    with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as pool:
+        outcomes = list(pool.map(lambda target: save_device(target[1]), devices))
+
+    # Only what was pending when the sweep started counts as saved
+    ledger.mark_saved({name: pending[name]["last"] for name, status in outcomes if status == "SAVED"})
+    ledger.compact()
+
+    results.extend(
+        (tb_file, name, status)
+        for (tb_file, _), (name, status) in zip(devices, outcomes)
+    )
+    return results
+
+
+def print_save_report(results):
+    from tabulate import tabulate
+
+    saved = sum(1 for _, _, status in results if status == "SAVED")
+
+    print("\n================== Save Report ===================\n")
+    print(tabulate(results, headers=["Testbed", "Device", "Status"], tablefmt="grid"))
+    print(f"\nSaved  : {saved}")
+    print(f"Failed : {len(results) - saved}")
+    print("==================================================")
+
+# ==========================================================
+# Main
+# ==========================================================
+
+def main(ledger=None, max_in_flight=SAVE_MAX_IN_FLIGHT):
+    start_time = time.time()
+    results = flush_pending(ledger, max_in_flight)
+    if results:
+        print_save_report(results)
+    print(f"\n⏱️ Total runtime: {time.time() - start_time:.2f} seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,688 @@
+#!/usr/bin/env python3
+"""
+SSH Port Utilization collector (netmiko, sharded)
+
+Same report as 15.py, but the target host list can be split across
+several worker processes (shards). Each shard runs its own bounded
+ThreadPoolExecutor of SSH sessions, so SSH crypto and parsing are no
+longer capped by a single core / the GIL.
+
+Failed hosts are not retried inside the main pool: they go onto a
+retry queue with exponential backoff that is drained by its own small
+pool, so a backing-off host never holds a main pool slot.
+
+Per-device durations are kept in a history file. On later runs hosts
+are scheduled longest-expected-first (LPT), so slow stacks start early
+instead of dominating the tail of the run.
+
+RUN_DEADLINE / DEVICE_BUDGET (see run_deadline.py) bound the run: a
+device over its budget has its session closed and is reported as
+"TIMED OUT", and the report is written on time with whatever finished.
+
+Before any SSH session, every target's TCP/22 is probed at once (see
+reachability.py, PREFLIGHT=1); hosts that do not answer are reported as
+"UNREACHABLE" and never take a pool slot or a retry.
+
+Run:
+  export LIBRENMS_TOKEN="your_token"
+  SHARDS=4 MAX_WORKERS=8 python ssh_ports_parallel.py
+"""
+
+import os
+import re
+import json
+import time
+import heapq
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+
+from run_deadline import RunDeadline, SessionRegistry, TIMED_OUT, exit_if_abandoned
+from reachability import PREFLIGHT, SSH_PORT, UNREACHABLE, probe_all
+
+# requests, netmiko, openpyxl, pandas and tabulate are imported where they
+# are used, so paths that exit early never pay for them.
+
+# ===============================
+# CONFIGURATION
+# ===============================
+INPUT_EXCEL = "librenms_devices.xlsx"
+OUTPUT_EXCEL = "ssh_device_ports_status.xlsx"
+
+LIBRENMS_URL = "http://localhost:8081"
+API_TOKEN = os.getenv("LIBRENMS_TOKEN")
+
+USERNAME = "admin"
+PASSWORD = "cisco"   # <-- set correctly
+
+DEVICE_TYPE = "cisco_ios"
+CONNECT_DELAY = 0.2
+
+# Worker processes; each one gets its own SSH pool of MAX_WORKERS sessions
+SHARDS = int(os.getenv("SHARDS", "1"))
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", "5"))
+
+# Deferred retry queue (per shard)
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))   # total attempts incl. the first
+RETRY_WORKERS = int(os.getenv("RETRY_WORKERS", "2"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "5"))     # seconds, doubled per attempt
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "60"))
+RETRY_ALONGSIDE = os.getenv("RETRY_ALONGSIDE", "1") == "1"      # 0 = drain after the main pass
+
+# Makespan-aware scheduling
+SCHEDULE = os.getenv("SCHEDULE", "lpt")                          # lpt | input (Excel order)
+HISTORY_FILE = "ssh_device_durations.json"
+HISTORY_ALPHA = 0.5          # weight of the newest duration in the moving average
+DEFAULT_DURATION = 10.0      # seconds, when there is no history at all
+
+# Deadline / budgets: RUN_DEADLINE and DEVICE_BUDGET env, see run_deadline.py
+WATCHDOG_TICK = 0.5          # seconds between straggler checks
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 25
+
+# Per process: deadline of the running pool and open netmiko sessions
+CURRENT_DEADLINE = RunDeadline()
+SESSIONS = SessionRegistry()
+
+HEADERS = {
+    "X-Auth-Token": API_TOKEN,
+    "Accept": "application/json",
+}
+
+# Media types we want as columns
+MEDIA_COLUMNS = [
+    "10/100BaseTX",
+    "10/100/1000BaseTX",
+    "1000BaseLX SFP",
+]
+
+STATUS_WORDS = {
+    "connected",
+    "notconnect",
+    "disabled",
+    "err-disabled",
+    "inactive",
+}
+
+# ===============================
+# LIBRENMS
+# ===============================
+def get_active_cisco_devices():
+    """
+    Returns {hostname: hardware} for UP ios/iosxe devices.
+    The hardware string (e.g. C9300-48P) feeds the duration estimates.
+    """
+    import requests
+    import urllib3
+
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    r = requests.get(
+        f"{LIBRENMS_URL}/api/v0/devices",
+        headers=HEADERS,
+        verify=False,
+        timeout=20,
+    )
+    r.raise_for_status()
+
+    return {
+        d["hostname"]: d.get("hardware") or ""
+        for d in r.json()["devices"]
+        if d.get("status") == 1 and d.get("os") in ("ios", "iosxe")
+    }
+
+# ===============================
+# PARSER
+# ===============================
+def parse_interfaces(output: str):
+    total_ports = 0
+    active_ports = 0
+
+    media_counts = {m: 0 for m in MEDIA_COLUMNS}
+
+    for raw in output.splitlines():
+        line = raw.strip()
+        if not line or line.startswith("Port"):
+            continue
+
+        if not line.startswith(("Fa", "Gi", "Te", "Po")):
+            continue
+
+        parts = line.split()
+
+        # Find status token position
+        status_idx = None
+        for i, p in enumerate(parts):
+            if p in STATUS_WORDS:
+                status_idx = i
+                break
+
+        if status_idx is None or len(parts) < status_idx + 5:
+            continue
+
+        status = parts[status_idx]
+        port_type = " ".join(parts[status_idx + 4:])
+
+        total_ports += 1
+
+        if status == "connected":
+            active_ports += 1
+            for media in MEDIA_COLUMNS:
+                if media in port_type:
+                    media_counts[media] += 1
+
+    return total_ports, active_ports, media_counts
+
+def pct(active, total):
+    return round((active / total) * 100, 2) if total else 0
+
+# ===============================
+# SSH WORKER
+# ===============================
+def empty_row(hostname: str):
+    row = {
+        "Hostname": hostname,
+        "Total Ports": 0,
+        "Active Ports": 0,
+        "Port Utilization %": 0,
+    }
+    for m in MEDIA_COLUMNS:
+        row[m] = 0
+    return row
+
+def finish_row(row, status, attempts):
+    row["Status"] = status
+    row["Attempts"] = attempts
+    return row
+
+def ssh_worker(hostname: str):
+    """
+    Collect one device. Raises on any SSH / parsing failure.
+    All timeouts are clipped to the device budget of CURRENT_DEADLINE.
+    """
+    from netmiko import ConnectHandler
+
+    time.sleep(CONNECT_DELAY)
+
+    deadline = CURRENT_DEADLINE
+    device = {
+        "device_type": DEVICE_TYPE,
+        "host": hostname,
+        "username": USERNAME,
+        "password": PASSWORD,
+        "fast_cli": False,
+        "conn_timeout": deadline.clip(CONNECT_TIMEOUT),
+        "auth_timeout": deadline.clip(CONNECT_TIMEOUT),
+        "banner_timeout": deadline.clip(CONNECT_TIMEOUT),
+    }
+
+    row = empty_row(hostname)
+
+    print(f"🔍 [pid {os.getpid()}] Connecting to {hostname} ...")
+
+    with ConnectHandler(**device) as conn:
+        SESSIONS.register(hostname, conn.remote_conn_pre.close)
+        try:
+            output = conn.send_command(
+                "show interfaces status",
+                expect_string=r"#",
+                read_timeout=deadline.clip(READ_TIMEOUT),
+            )
+        finally:
+            SESSIONS.unregister(hostname)
+
+    total, active, media = parse_interfaces(output)
+
+    row["Total Ports"] = total
+    row["Active Ports"] = active
+    row["Port Utilization %"] = pct(active, total)
+
+    for m in MEDIA_COLUMNS:
+        row[m] = media[m]
+
+    return row
+
+def timed_call(worker, hostname, started=None):
+    """
+    Run the worker and record how long the device took. The start time
+    is published in `started` for the straggler watchdog.
+    """
+    if started is not None:
+        started[hostname] = time.time()
+    start = time.monotonic()
+    row = worker(hostname)
+    row["Duration s"] = round(time.monotonic() - start, 2)
+    return row
+
+# ===============================
+# RETRY QUEUE
+# ===============================
+class RetryQueue:
+    """
+    Hosts waiting for another attempt, ordered by the time their backoff
+    expires. drain() runs them on a separate pool of `max_workers`
+    threads until close() was called and nothing is left.
+
+    No retry is started once it could not begin before the run deadline;
+    such hosts are recorded as FAILED. Retries in flight are watched like
+    the main pass: one over its device budget, or still running at the
+    run deadline, has its session closed and is recorded as TIMED OUT.
+    """
+
+    def __init__(self, worker, max_workers=RETRY_WORKERS, max_attempts=RETRY_MAX_ATTEMPTS,
+                 base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY, deadline=None):
+        self.worker = worker
+        self.deadline = deadline or RunDeadline()
+        self.max_workers = max(1, max_workers)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.results = []           # [(index, row), ...] of retried hosts
+        self._heap = []             # (ready_at, seq, index, hostname, attempt)
+        self._seq = 0
+        self._in_flight = 0
+        self._started = {}          # hostname: (index, attempt, start time) of retries in flight
+        self._abandoned = set()
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def backoff(self, attempt):
+        """Delay before `attempt` (2, 3, ...): base * 2^(n-2), capped, with jitter."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 2)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def put(self, index, hostname, attempt):
+        """Schedule `attempt` for a host, or record it as failed if the cap is reached."""
+        if hostname in self._abandoned:
+            return
+        delay = self.backoff(attempt)
+
+        if attempt > self.max_attempts or delay >= self.deadline.remaining():
+            with self._cond:
+                self.results.append((index, finish_row(empty_row(hostname), "FAILED", attempt - 1)))
+                self._cond.notify_all()
+            return
+
+        ready_at = time.monotonic() + delay
+        with self._cond:
+            heapq.heappush(self._heap, (ready_at, self._seq, index, hostname, attempt))
+            self._seq += 1
+            self._cond.notify_all()
+
+    def close(self):
+        """No more hosts will be added by the main pass."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _abandon_stragglers(self):
+        """Close the sessions of retries over budget (called with the lock held)."""
+        for hostname, (index, attempt, started) in list(self._started.items()):
+            if not self.deadline.device_expired(started):
+                continue
+            del self._started[hostname]
+            self._abandoned.add(hostname)
+            self._in_flight -= 1
+            self.results.append((index, finish_row(empty_row(hostname), TIMED_OUT, attempt)))
+            print(f"⏰ Retry {attempt}/{self.max_attempts} of {hostname} timed out, abandoned")
+            threading.Thread(target=SESSIONS.abort, args=(hostname,), daemon=True).start()
+
+    def _next(self):
+        """Block until a host is due and a retry slot is free, None when finished."""
+        with self._cond:
+            while True:
+                self._abandon_stragglers()
+
+                if self.deadline.expired():
+                    while self._heap:
+                        _, _, index, hostname, attempt = heapq.heappop(self._heap)
+                        self.results.append((index, finish_row(empty_row(hostname), "FAILED", attempt - 1)))
+
+                if self._closed and not self._heap and not self._in_flight:
+                    return None
+
+                timeout = None
+                if self._heap and self._in_flight < self.max_workers:
+                    timeout = self._heap[0][0] - time.monotonic()
+                    if timeout <= 0:
+                        self._in_flight += 1
+                        return heapq.heappop(self._heap)
+
+                # No run deadline: remaining() is inf, which wait() cannot take
+                remaining = self.deadline.remaining()
+                if self._heap and remaining != float("inf"):
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+                if self._started:
+                    timeout = WATCHDOG_TICK if timeout is None else min(timeout, WATCHDOG_TICK)
+
+                self._cond.wait(timeout)
+
+    def _attempt(self, index, hostname, attempt):
+        with self._cond:
+            self._started[hostname] = (index, attempt, time.time())
+        try:
+            row = timed_call(self.worker, hostname)
+            with self._cond:
+                if hostname not in self._abandoned:
+                    print(f"🔁 Retry {attempt}/{self.max_attempts} succeeded for {hostname}")
+                    self.results.append((index, finish_row(row, "OK", attempt)))
+        except Exception as e:
+            if hostname not in self._abandoned:
+                print(f"❌ Retry {attempt}/{self.max_attempts} failed for {hostname}: {e}")
+                self.put(index, hostname, attempt + 1)
+        finally:
+            with self._cond:
+                # An abandoned retry was already counted out by the watchdog
+                if self._started.pop(hostname, None) is not None:
+                    self._in_flight -= 1
+                self._cond.notify_all()
+
+    def drain(self):
+        # Not a `with` block: it would wait for abandoned retries to unwind
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while True:
+                item = self._next()
+                if item is None:
+                    return
+                _, _, index, hostname, attempt = item
+                pool.submit(self._attempt, index, hostname, attempt)
+        finally:
+            pool.shutdown(wait=False)
+
+# ===============================
+# DURATION HISTORY / LPT
+# ===============================
+def load_history(path=HISTORY_FILE):
+    """{hostname: {"seconds": float, "model": str, "ports": int}}"""
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable duration history {path}: {e}")
+        return {}
+
+def save_history(history, path=HISTORY_FILE):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(history, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def update_history(history, rows, models):
+    """Fold the durations of successful rows into the moving averages."""
+    for row in rows:
+        seconds = row.get("Duration s")
+        if row.get("Status") != "OK" or seconds is None:
+            continue
+
+        host = row["Hostname"]
+        old = history.get(host, {}).get("seconds")
+        history[host] = {
+            "seconds": round(seconds if old is None else
+                             HISTORY_ALPHA * seconds + (1 - HISTORY_ALPHA) * old, 2),
+            "model": models.get(host, ""),
+            "ports": row.get("Total Ports", 0),
+        }
+    return history
+
+def ports_from_model(model):
+    """Port count hinted by the PID, e.g. C9300-48P -> 48, WS-C2960C-8TC-L -> 8."""
+    m = re.search(r"-(\d{1,2})[A-Z]", model or "")
+    return int(m.group(1)) if m else 0
+
+def expected_durations(targets, history, models):
+    """
+    Expected seconds per target, in target order:
+    1) the host's own history
+    2) the average of known hosts with the same model
+    3) port count (from the model) x fitted seconds per port
+    4) the median of all known hosts, or DEFAULT_DURATION
+    """
+    by_model = {}
+    for entry in history.values():
+        by_model.setdefault(entry.get("model", ""), []).append(entry["seconds"])
+
+    fitted_ports = sum(e.get("ports", 0) for e in history.values())
+    per_port = sum(e["seconds"] for e in history.values() if e.get("ports")) / fitted_ports \
+        if fitted_ports else 0
+
+    known = sorted(e["seconds"] for e in history.values())
+    fallback = known[len(known) // 2] if known else DEFAULT_DURATION
+
+    expected = []
+    for host in targets:
+        model = models.get(host, "")
+        if host in history:
+            expected.append(history[host]["seconds"])
+        elif model and by_model.get(model):
+            expected.append(sum(by_model[model]) / len(by_model[model]))
+        elif per_port and ports_from_model(model):
+            expected.append(per_port * ports_from_model(model))
+        else:
+            expected.append(fallback)
+    return expected
+
+def simulate_makespan(durations, workers):
+    """Wall time of a FIFO pool of `workers` fed `durations` in that order."""
+    slots = [0.0] * max(1, workers)
+    for d in durations:
+        heapq.heapreplace(slots, slots[0] + d)
+    return max(slots)
+
+# ===============================
+# SHARDING
+# ===============================
+def split_shards(targets, shards, expected=None):
+    """
+    Split the target list into `shards` lists of (index, hostname). The
+    index is the position in the input Excel and is used to put the
+    merged rows back in their original order.
+
+    Without `expected` durations this is a round-robin split. With them,
+    hosts are taken longest-first and each goes to the least loaded shard,
+    so every shard (and its pool) also receives its hosts in LPT order.
+    """
+    buckets = [[] for _ in range(shards)]
+
+    if expected is None:
+        for idx, host in enumerate(targets):
+            buckets[idx % shards].append((idx, host))
+        return [b for b in buckets if b]
+
+    loads = [(0.0, i) for i in range(shards)]
+    for idx in sorted(range(len(targets)), key=lambda i: -expected[i]):
+        load, shard = heapq.heappop(loads)
+        buckets[shard].append((idx, targets[idx]))
+        heapq.heappush(loads, (load + expected[idx], shard))
+    return [b for b in buckets if b]
+
+def run_pool(indexed_hosts, worker=ssh_worker, max_workers=MAX_WORKERS, deadline=None):
+    """
+    Bounded SSH pool for one shard. Returns [(index, row), ...].
+
+    Hosts that fail in the main pass are handed to a RetryQueue, drained
+    alongside the main pass (or after it, RETRY_ALONGSIDE=0).
+
+    A watchdog abandons hosts that run over their device budget, and
+    everything still running or queued once the run deadline passes;
+    the retry queue does the same for retries in flight. Those hosts
+    are reported as TIMED OUT and are not retried.
+    """
+    global CURRENT_DEADLINE
+    deadline = deadline or RunDeadline()
+    CURRENT_DEADLINE = deadline
+
+    results = []
+    retries = RetryQueue(worker, deadline=deadline)
+    drainer = threading.Thread(target=retries.drain, daemon=True)
+
+    if RETRY_ALONGSIDE:
+        drainer.start()
+
+    started = {}
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    pending = {pool.submit(timed_call, worker, h, started): (idx, h) for idx, h in indexed_hosts}
+
+    while pending:
+        done, _ = wait(pending, timeout=WATCHDOG_TICK, return_when=FIRST_COMPLETED)
+
+        for f in done:
+            idx, hostname = pending.pop(f)
+            try:
+                results.append((idx, finish_row(f.result(), "OK", 1)))
+            except Exception as e:
+                print(f"❌ SSH failed for {hostname}: {e} (queued for retry)")
+                retries.put(idx, hostname, 2)
+
+        for f, (idx, hostname) in list(pending.items()):
+            device_started = started.get(hostname)
+            if device_started is None:
+                if not deadline.expired():
+                    continue
+            elif not deadline.device_expired(device_started):
+                continue
+
+            # Straggler (or never started before the deadline): abandon it
+            f.cancel()
+            SESSIONS.abort(hostname)
+            del pending[f]
+            print(f"⏰ {hostname} timed out, abandoned")
+            results.append((idx, finish_row(empty_row(hostname), TIMED_OUT, 1)))
+
+    pool.shutdown(wait=False, cancel_futures=True)
+    retries.close()
+    if not RETRY_ALONGSIDE:
+        drainer.start()
+    drainer.join()
+
+    return results + retries.results
+
+def run_shard(args):
+    """Entry point of one worker process."""
+    indexed_hosts, worker, max_workers, deadline = args
+    return run_pool(indexed_hosts, worker, max_workers, deadline)
+
+def run_sharded(targets, shards=SHARDS, max_workers=MAX_WORKERS, worker=ssh_worker,
+                expected=None, deadline=None):
+    """
+    Collect rows for all targets using `shards` processes x `max_workers`
+    threads. Rows come back merged, in input order. Pass `expected`
+    durations to schedule longest-expected-first, and a RunDeadline to
+    bound the whole run.
+
+    `worker` must be a module-level function (it is pickled into the
+    worker processes).
+    """
+    deadline = deadline or RunDeadline()
+    shards = max(1, min(shards, len(targets) or 1))
+    buckets = split_shards(targets, shards, expected)
+
+    if shards == 1:
+        indexed = run_pool(buckets[0] if buckets else [], worker, max_workers, deadline)
+    else:
+        indexed = []
+        procs = ProcessPoolExecutor(max_workers=shards)
+        jobs = [procs.submit(run_shard, (b, worker, max_workers, deadline)) for b in buckets]
+        for job in as_completed(jobs):
+            indexed.extend(job.result())
+        # Shards that abandoned stragglers may still be closing them
+        procs.shutdown(wait=False)
+
+    indexed.sort(key=lambda item: item[0])
+    return [row for _, row in indexed]
+
+# ===============================
+# INPUT / REPORT
+# ===============================
+def read_hostnames(path=None):
+    """The 'hostname' column of the input Excel (openpyxl, no pandas)."""
+    from openpyxl import load_workbook
+
+    # Looked up at call time: netops.py sets INPUT_EXCEL after import
+    path = path or INPUT_EXCEL
+    wb = load_workbook(path, read_only=True, data_only=True)
+    rows = wb.active.iter_rows(values_only=True)
+
+    header = [str(c).strip() if c is not None else "" for c in next(rows, [])]
+    if "hostname" not in header:
+        raise ValueError("Excel must contain a column named 'hostname'")
+
+    col = header.index("hostname")
+    hostnames = [str(r[col]).strip() for r in rows if r and r[col] is not None]
+    wb.close()
+    return hostnames
+
+def write_report(results):
+    import pandas as pd
+    from tabulate import tabulate
+
+    result_df = pd.DataFrame(results)
+
+    print("\n📊 SSH Port Utilization Summary (SHARDED)\n")
+    print(tabulate(result_df, headers="keys", tablefmt="grid", showindex=False))
+
+    result_df.to_excel(OUTPUT_EXCEL, index=False)
+    print(f"\n✅ Results saved to {OUTPUT_EXCEL}")
+
+# ===============================
+# MAIN
+# ===============================
+def main(input_excel=None):
+    deadline = RunDeadline()
+
+    if not API_TOKEN:
+        raise RuntimeError("LIBRENMS_TOKEN not set")
+
+    hostnames = read_hostnames(input_excel)
+
+    active_devices = get_active_cisco_devices()
+    targets = [h for h in hostnames if h in active_devices]
+
+    unreachable = []
+    if PREFLIGHT:
+        reachable = probe_all({h: (h, SSH_PORT) for h in targets})
+        unreachable = [h for h in targets if not reachable[h]]
+        targets = [h for h in targets if reachable[h]]
+
+    history = load_history()
+    expected = expected_durations(targets, history, active_devices)
+
+    slots = SHARDS * MAX_WORKERS
+    input_makespan = simulate_makespan(expected, slots)
+    lpt_makespan = simulate_makespan(sorted(expected, reverse=True), slots)
+
+    print(
+        f"\n🚀 Running sharded SSH for {len(targets)} active devices "
+        f"(shards={SHARDS}, workers/shard={MAX_WORKERS}, schedule={SCHEDULE})"
+    )
+    print(
+        f"📐 Expected makespan: Excel order {input_makespan:.1f}s, "
+        f"LPT {lpt_makespan:.1f}s ({len(history)} devices with history)\n"
+    )
+
+    start = time.time()
+    results = run_sharded(
+        targets, SHARDS, MAX_WORKERS,
+        expected=expected if SCHEDULE == "lpt" else None,
+        deadline=deadline,
+    )
+    elapsed = round(time.time() - start, 2)
+
+    # Report in Excel order, unreachable hosts included
+    rows = {row["Hostname"]: row for row in results}
+    rows.update((h, finish_row(empty_row(h), UNREACHABLE, 0)) for h in unreachable)
+    results = [rows[h] for h in hostnames if h in rows]
+
+    save_history(update_history(history, results, active_devices))
+
+    write_report(results)
+    print(f"⏱ Execution time: {elapsed} seconds")
+
+    # Report is on disk; do not wait for abandoned sessions to unwind
+    exit_if_abandoned([r["Hostname"] for r in results if r["Status"] == TIMED_OUT])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Cached, pre-parsed testbed loading
+
+loader.load() parses the YAML file with a pure-Python parser and then
+builds every Device object on each run; for generated testbeds with
+thousands of devices the parsing alone takes seconds. load_testbed()
+keeps the parsed testbed (the plain dict, pickled) next to the scripts
+and builds the Testbed from it with loader.load(dict) while the file is
+unchanged. A loaded Testbed itself cannot be pickled (genie objects
+hold weak references), so only the parsing is cached.
+
+Cache key: absolute path + mtime + sha256 of the content + pyATS
+version. Any mismatch or unreadable cache file falls back to parsing
+the file again; a cache directory that cannot be written only costs
+the cache.
+
+Testbeds with loader markup (%ASK{...}, %ENV{...}, ...) or `extends:`
+are never cached: the loader resolves those when it reads the file, so
+a cached copy would keep old answers and credentials after they change.
+
+The pickle contains the testbed credentials, so the cache directory
+and its files are created owner-only.
+
+Environment:
+  TESTBED_CACHE=1                  0 disables the cache
+  TESTBED_CACHE_DIR=.testbed_cache
+"""
+
+import os
+import re
+import time
+import pickle
+import hashlib
+
+# ==============================
+# CONFIG
+# ==============================
+TESTBED_CACHE = os.getenv("TESTBED_CACHE", "1") == "1"
+TESTBED_CACHE_DIR = os.getenv("TESTBED_CACHE_DIR", ".testbed_cache")
+
+MARKUP_RE = re.compile(rb"%[A-Z_]+\{")
+
+# ==============================
+# CACHE
+# ==============================
+def cache_path(path):
+    name = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:16]
+    return os.path.join(TESTBED_CACHE_DIR, f"{name}.pickle")
+
+
+def pyats_version():
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return version("pyats")
+    except PackageNotFoundError:
+        return None
+
+
+def file_key(path):
+    """Cache key of a testbed file, None if it must not be cached (markup)."""
+    with open(path, "rb") as f:
+        content = f.read()
+    if MARKUP_RE.search(content):
+        return None
+    return {
+        "path": os.path.abspath(path),
+        "mtime": os.stat(path).st_mtime,
+        "sha256": hashlib.sha256(content).hexdigest(),
+        "pyats": pyats_version(),
+    }
+
+
+def read_cache(path, key):
+    """(parsed testbed dict, parse seconds) from the cache, or None on a miss."""
+    try:
+        with open(cache_path(path), "rb") as f:
+            meta, payload = pickle.load(f)
+        if any(meta.get(k) != v for k, v in key.items()):
+            return None
+        return pickle.loads(payload), meta.get("parse_seconds", 0.0)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️ Ignoring unreadable testbed cache for {path}: {e}")
+        return None
+
+
+def write_cache(path, key, data, parse_seconds):
+    """True if the parsed testbed was written to the cache."""
+    tmp = None
+    try:
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.makedirs(TESTBED_CACHE_DIR, mode=0o700, exist_ok=True)
+        target = cache_path(path)
+        tmp = f"{target}.{os.getpid()}.tmp"
+
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((dict(key, parse_seconds=parse_seconds), payload), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, target)
+        return True
+
+    except Exception as e:
+        print(f"⚠️ Testbed {path} cannot be cached: {e}")
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)
+        return False
+
+
+def parse_testbed(path):
+    """The testbed file as a dict for loader.load(), None if it must be read by the loader."""
+    import yaml
+
+    with open(path) as f:
+        data = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+    if not isinstance(data, dict) or "extends" in data:
+        return None
+
+    # Loaded from a file, the testbed is named after it unless it says otherwise
+    testbed = data.setdefault("testbed", {}) or {}
+    testbed.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+    data["testbed"] = testbed
+    return data
+
+
+def load_testbed(path):
+    """Drop-in replacement for loader.load(path)."""
+    from pyats.topology import loader
+
+    if not TESTBED_CACHE:
+        return loader.load(path)
+
+    key = file_key(path)
+    if key is None:
+        return loader.load(path)
+
+    start = time.perf_counter()
+    cached = read_cache(path, key)
+
+    if cached is not None:
+        data, parse_seconds = cached
+        took = time.perf_counter() - start
+        testbed = loader.load(data)
+        print(
+            f"📦 Testbed {path} from cache: read in {took:.2f}s "
+            f"(parse {parse_seconds:.2f}s, saved {max(0.0, parse_seconds - took):.2f}s)"
+        )
+        return testbed
+
+    data = parse_testbed(path)
+    if data is None:
+        return loader.load(path)
+    parse_seconds = time.perf_counter() - start
+
+    if write_cache(path, key, data, parse_seconds):
+        print(f"📦 Testbed {path} parsed in {parse_seconds:.2f}s (cached for next run)")
+    return loader.load(data)